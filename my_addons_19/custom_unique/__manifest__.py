@@ -3,16 +3,19 @@
 
 {
     'name': 'Unique CRM/sale/Purchase/Project',
-    'version': '19.0.0',
+    'version': '19.0.1.2',
     'category': 'crm',
     'sequence': 1,
     'depends': ['base', 'crm', 'website', 'contacts', 'sale','sale_management', 'resource', 'project', 'purchase', 'account', 'hr', 'stock', 'hr_attendance', 'hr_holidays', 'sale_project'],
     'data': [
         'data/sequence.xml',
         'data/mail_template.xml',
+        'data/ir_cron.xml',
+        'data/tracking_policy_data.xml',
 
         'security/ir.model.access.csv',
         'security/res_groups.xml',
+        'security/ir_rule.xml',
 
         'views/crm_enquiry_view.xml',
         'views/res_user_view.xml',
@@ -21,7 +24,11 @@
         'views/project_project_view.xml',
         'views/account_move_view.xml',
         'views/hr_employee_view.xml',
+        'views/hr_attendance_period_view.xml',
+        'views/tracking_policy_view.xml',
+        'views/res_config_settings_view.xml',
         'report/sale_quotation_report.xml',
+        'report/hr_attendance_report_views.xml',
         'views/menu_view.xml',
 
         'wizard/import_attendance_view.xml',
@@ -7,6 +7,13 @@ from odoo import http
 from odoo.http import request
 import json   # <-- Add this line
 from odoo import http, fields
+from odoo.addons.custom_unique.models.crm_enquiry import (
+    APPROVAL_MAIL_SYNC_PARAM, PORTAL_PAGE_CACHE_SIZE, _PORTAL_PAGE_CACHE,
+)
+from odoo.addons.custom_unique.models.attendance_punch import PUNCH_BATCH_LIMIT
+from werkzeug.exceptions import BadRequest
+from werkzeug.http import http_date
+import hashlib
 
 
 
@@ -17,18 +24,43 @@ class PartnerConfirmationController(http.Controller):
 
     @http.route('/partner/confirmation/<string:token>', type='http', auth='public', website=True)
     def partner_confirmation_portal(self, token, **kw):
-        partner = request.env['res.partner'].sudo().search([('token', '=', token)], limit=1)
-        print("\n\n\n\n\n\n\n\n\n\n\n\n\n==================", partner)
+        partner = request.env['res.partner'].sudo()._get_partner_by_token(token)
         if not partner:
             return request.not_found()
 
-        return request.render('custom_unique.partner_confirmation_template', {
-            'partner': partner
-        })
+        # the page embeds the session's CSRF token and the visitor's layout,
+        # so it is only reused for the same partner version, user and session
+        write_date = partner.write_date.replace(microsecond=0)
+        session_hash = hashlib.sha1((request.session.sid or '').encode()).hexdigest()[:16]
+        cache_key = (request.env.cr.dbname, partner.id, write_date, request.env.uid, request.env.lang, session_hash)
+        etag = '"%s"' % hashlib.sha1(repr(cache_key).encode()).hexdigest()
+        headers = [
+            ('ETag', etag),
+            ('Last-Modified', http_date(write_date)),
+            ('Cache-Control', 'private, no-cache'),
+            ('Vary', 'Cookie'),
+        ]
+
+        # only the ETag covers the user, session and language: no If-Modified-Since shortcut
+        if request.httprequest.if_none_match.contains(etag.strip('"')):
+            return request.make_response('', headers=headers, status=304)
+
+        html = _PORTAL_PAGE_CACHE.get(cache_key)
+        if html is None:
+            html = request.render('custom_unique.partner_confirmation_template', {
+                'partner': partner,
+                'token': token,
+            }).render()
+            _PORTAL_PAGE_CACHE[cache_key] = html
+            if len(_PORTAL_PAGE_CACHE) > PORTAL_PAGE_CACHE_SIZE:
+                _PORTAL_PAGE_CACHE.popitem(last=False)
+        else:
+            _PORTAL_PAGE_CACHE.move_to_end(cache_key)
+        return request.make_response(html, headers=headers + [('Content-Type', 'text/html; charset=utf-8')])
 
     @http.route('/partner/approve/<string:token>', type='http', auth='public', website=True, methods=['POST'])
     def approve_partner(self, token, **kw):
-        partner = request.env['res.partner'].sudo().search([('token', '=', token)], limit=1)
+        partner = request.env['res.partner'].sudo()._get_partner_by_token(token)
         user = request.env.user
         if user.is_boss:
             if partner:
@@ -43,7 +75,7 @@ class PartnerConfirmationController(http.Controller):
                     if not template:
                         return
 
-                    boss = request.env['res.partner'].sudo().search([('is_boss', '=', True), ('email', '!=', False)], limit=1)
+                    boss = partner._get_boss_directory(partner.company_id)['partner'].sudo()
                     print(">>>>>>>>>>", boss)
 
                     if not boss:
@@ -55,11 +87,11 @@ class PartnerConfirmationController(http.Controller):
                     ctx = {
                         'boss_name': boss.name or 'Boss',
                     }
-                    template.sudo().with_context(ctx).send_mail(partner.id, email_values=email_values, force_send=True)
+                    partner._send_partner_mail(template.sudo(), email_values, ctx, APPROVAL_MAIL_SYNC_PARAM)
 
                     if partner.user_id:
                         message = f"Hello {partner.user_id.name}, your partner '{partner.name}' is approved by the Boss!"
-                        request.env['bus.bus']._sendone(
+                        request.env['notification.dispatcher'].sudo()._queue(
                             partner.user_id.partner_id,
                             'simple_notification',
                             {
@@ -77,7 +109,7 @@ class PartnerConfirmationController(http.Controller):
 
     @http.route('/partner/block/<string:token>', type='http', auth='public', website=True, methods=['POST'])
     def block_partner(self, token, **kw):
-        partner = request.env['res.partner'].sudo().search([('token', '=', token)], limit=1)
+        partner = request.env['res.partner'].sudo()._get_partner_by_token(token)
         user = request.env.user
         if user.is_boss:
             if partner:
@@ -91,7 +123,7 @@ class PartnerConfirmationController(http.Controller):
                         f"Hello {partner.user_id.name}, your partner "
                         f"'{partner.name}' is rejected by the Boss."
                     )
-                    self.env['bus.bus']._sendone(
+                    request.env['notification.dispatcher'].sudo()._queue(
                         partner.user_id.partner_id,
                         'simple_notification',
                         {
@@ -105,3 +137,21 @@ class PartnerConfirmationController(http.Controller):
                 return json.dumps(True)
             print(f"\n❌ Failed to block Partner {token}. Missing reason or not found.\n")
             return json.dumps(False)
+
+
+class AttendancePunchController(http.Controller):
+
+    @http.route('/custom_unique/attendance/punches', type='jsonrpc', auth='bearer', methods=['POST'], csrf=False)
+    def attendance_punches(self, punches=None, **kw):
+        """
+        Batch endpoint of the time clocks, authenticated with an API key of a
+        user allowed to manage attendances. Takes ``punches``, a list of
+        ``{punch_id, employee_code, project_ref, timestamp, direction}``, and
+        returns ``{'results': [...]}`` with one result per punch, in order.
+        Sending the same punch_id again is safe: it is reported as duplicate.
+        """
+        if not isinstance(punches, list):
+            raise BadRequest("'punches' must be a list")
+        if len(punches) > PUNCH_BATCH_LIMIT:
+            raise BadRequest("At most %s punches per request" % PUNCH_BATCH_LIMIT)
+        return {'results': request.env['hr.attendance.punch']._ingest_punches(punches)}
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+"""
+Back-fill the stored reporting dimensions with set-based SQL before the
+registry loads, so the ORM finds the columns filled and does not compute
+them record by record on large tables.
+"""
+import logging
+
+from odoo.tools.sql import column_exists, create_column
+
+_logger = logging.getLogger(__name__)
+
+ENQUIRY_DIMENSION_COLUMNS = {
+    'client_id': 'int4',
+    'department_id': 'int4',
+    'user_id': 'int4',
+    'priority': 'varchar',
+    'calcification': 'varchar',
+    'sector': 'varchar',
+    'enq_probability': 'float8',
+}
+
+ATTENDANCE_DIMENSION_COLUMNS = {
+    'employee_code': 'varchar',
+    'sector': 'varchar',
+    'designation_id': 'int4',
+    'emp_working_dept': 'int4',
+    'employee_department': 'varchar',
+    'company_id': 'int4',
+    'company_code': 'varchar',
+    'project_ref': 'varchar',
+    'vessel_name': 'varchar',
+    'client_id': 'int4',
+}
+
+ENQUIRY_DIMENSION_SET = """
+    client_id = lead.client_id,
+    department_id = lead.department_id,
+    user_id = lead.user_id,
+    priority = lead.priority,
+    calcification = lead.calcification,
+    sector = client.sector,
+    enq_probability = lead.enq_probability
+"""
+
+
+def _create_columns(cr, table, columns):
+    for column, column_type in columns.items():
+        if not column_exists(cr, table, column):
+            create_column(cr, table, column, column_type)
+
+
+def _text_column(cr, table, column, alias):
+    """Plain text of a (possibly translated, jsonb) column"""
+    cr.execute("SELECT data_type FROM information_schema.columns WHERE table_name = %s AND column_name = %s",
+               [table, column])
+    row = cr.fetchone()
+    if row and row[0] == 'jsonb':
+        return "%s.%s->>'en_US'" % (alias, column)
+    return "%s.%s" % (alias, column)
+
+
+def migrate(cr, version):
+    if not version:
+        return
+
+    _create_columns(cr, 'sale_enquiry', ENQUIRY_DIMENSION_COLUMNS)
+    cr.execute("""
+        UPDATE sale_enquiry target
+           SET %s
+          FROM enquiry_lead lead
+          LEFT JOIN res_partner client ON client.id = lead.client_id
+         WHERE lead.id = target.enquiry_id
+    """ % ENQUIRY_DIMENSION_SET)
+    _logger.info("Back-filled dimensions of %s sale enquiries", cr.rowcount)
+
+    _create_columns(cr, 'sale_order', dict(ENQUIRY_DIMENSION_COLUMNS, enquiry_id='int4'))
+    cr.execute("""
+        UPDATE sale_order target
+           SET enquiry_id = enquiry.enquiry_id
+          FROM sale_enquiry enquiry
+         WHERE enquiry.id = target.sale_enquiry_id
+    """)
+    cr.execute("""
+        UPDATE sale_order target
+           SET %s
+          FROM enquiry_lead lead
+          LEFT JOIN res_partner client ON client.id = lead.client_id
+         WHERE lead.id = target.enquiry_id
+    """ % ENQUIRY_DIMENSION_SET)
+    _logger.info("Back-filled dimensions of %s sale orders", cr.rowcount)
+
+    _create_columns(cr, 'account_move', dict(ENQUIRY_DIMENSION_COLUMNS, enquiry_id='int4'))
+    cr.execute("""
+        UPDATE account_move target
+           SET enquiry_id = sale_order.enquiry_id
+          FROM sale_order
+         WHERE sale_order.id = target.sale_order_id
+    """)
+    cr.execute("""
+        UPDATE account_move target
+           SET %s
+          FROM enquiry_lead lead
+          LEFT JOIN res_partner client ON client.id = lead.client_id
+         WHERE lead.id = target.enquiry_id
+    """ % ENQUIRY_DIMENSION_SET)
+    _logger.info("Back-filled dimensions of %s invoices", cr.rowcount)
+
+    _create_columns(cr, 'hr_attendance', ATTENDANCE_DIMENSION_COLUMNS)
+    cr.execute("""
+        UPDATE hr_attendance target
+           SET employee_code = emp.code,
+               sector = emp.sector,
+               designation_id = emp.job_id,
+               emp_working_dept = emp.department_id,
+               employee_department = %(dept_name)s,
+               company_id = emp.company_id,
+               company_code = company.code
+          FROM hr_employee emp
+          LEFT JOIN hr_department dept ON dept.id = emp.department_id
+          LEFT JOIN res_company company ON company.id = emp.company_id
+         WHERE emp.id = target.employee_id
+    """ % {'dept_name': _text_column(cr, 'hr_department', 'name', 'dept')})
+    cr.execute("""
+        UPDATE hr_attendance target
+           SET project_ref = proj.project_ref,
+               vessel_name = %(project_name)s,
+               client_id = proj.client_id
+          FROM project_project proj
+         WHERE proj.id = target.project_id
+    """ % {'project_name': _text_column(cr, 'project_project', 'name', 'proj')})
+    _logger.info("Back-filled dimensions of %s attendances", cr.rowcount)
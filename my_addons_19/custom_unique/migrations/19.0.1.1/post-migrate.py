@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+"""
+Move the per-day overhead amounts copied on every attendance into one
+hr_attendance_allocation row per employee-month, then drop the columns:
+the attendance values are now computed from the allocation.
+
+The attendances of a month normally carry the same amounts. When they
+differ, the amounts of the most recently costed attendance are kept as a
+whole, and the employee-months concerned are logged for review.
+"""
+import logging
+
+from odoo.tools.sql import column_exists
+
+_logger = logging.getLogger(__name__)
+
+ALLOCATION_COLUMNS = [
+    'cpf_amount', 'levy_amount', 'accomodation_amount', 'transportation_amount', 'insurance_amount',
+    'admin_cost_amount', 'certification_audit_cost_amount', 'office_rent_amount', 'oh_cost_amount',
+    'others_cost_amount',
+]
+
+
+def migrate(cr, version):
+    if not version or not column_exists(cr, 'hr_attendance', 'cpf_amount'):
+        return
+
+    cr.execute("""
+        SELECT att.employee_id, date_trunc('month', att.attendance_date)::date
+          FROM hr_attendance att
+         WHERE att.employee_id IS NOT NULL
+           AND att.attendance_date IS NOT NULL
+      GROUP BY att.employee_id, date_trunc('month', att.attendance_date)
+        HAVING COUNT(DISTINCT ROW(%(columns)s)) > 1
+      ORDER BY 2, 1
+    """ % {'columns': ', '.join('COALESCE(att.%s, 0)' % column for column in ALLOCATION_COLUMNS)})
+    for employee_id, month in cr.fetchall():
+        _logger.warning("Attendances of employee %s in %s had different overhead amounts, "
+                        "the most recently costed ones are kept", employee_id, month.strftime('%Y-%m'))
+
+    cr.execute("""
+        INSERT INTO hr_attendance_allocation (
+            employee_id, month, date_from, date_to, working_days, %(columns)s, total_amount,
+            create_uid, create_date, write_uid, write_date
+        )
+        SELECT latest.employee_id,
+               latest.month,
+               latest.month,
+               (latest.month + interval '1 month' - interval '1 day')::date,
+               days.working_days,
+               %(latest_columns)s,
+               %(total)s,
+               1, now() at time zone 'UTC', 1, now() at time zone 'UTC'
+          FROM (
+                SELECT DISTINCT ON (att.employee_id, date_trunc('month', att.attendance_date))
+                       att.employee_id,
+                       date_trunc('month', att.attendance_date)::date AS month,
+                       %(att_columns)s
+                  FROM hr_attendance att
+                 WHERE att.employee_id IS NOT NULL
+                   AND att.attendance_date IS NOT NULL
+              ORDER BY att.employee_id, date_trunc('month', att.attendance_date),
+                       att.write_date DESC NULLS LAST, att.id DESC
+               ) latest
+          JOIN (
+                SELECT att.employee_id,
+                       date_trunc('month', att.attendance_date)::date AS month,
+                       COUNT(DISTINCT att.attendance_date) AS working_days
+                  FROM hr_attendance att
+                 WHERE att.employee_id IS NOT NULL
+                   AND att.attendance_date IS NOT NULL
+              GROUP BY att.employee_id, date_trunc('month', att.attendance_date)
+               ) days ON days.employee_id = latest.employee_id AND days.month = latest.month
+   ON CONFLICT (employee_id, month, date_from) DO NOTHING
+    """ % {
+        'columns': ', '.join(ALLOCATION_COLUMNS),
+        'att_columns': ', '.join('COALESCE(att.%s, 0) AS %s' % (column, column) for column in ALLOCATION_COLUMNS),
+        'latest_columns': ', '.join('latest.%s' % column for column in ALLOCATION_COLUMNS),
+        'total': ' + '.join('latest.%s' % column for column in ALLOCATION_COLUMNS),
+    })
+    _logger.info("Created %s attendance overhead allocations", cr.rowcount)
+
+    cr.execute("ALTER TABLE hr_attendance %s" % ', '.join(
+        'DROP COLUMN IF EXISTS %s' % column for column in ALLOCATION_COLUMNS + ['total_expense']
+    ))
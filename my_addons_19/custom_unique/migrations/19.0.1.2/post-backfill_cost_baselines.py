@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+"""
+Give every employee a baseline cost profile with their current costs, so
+later dated profiles no longer reach back before their date.
+"""
+import logging
+
+from odoo.addons.custom_unique.models.hr_employee_cost_profile import (
+    COST_PROFILE_BASELINE_DATE,
+    COST_PROFILE_FIELDS,
+)
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    cr.execute("""
+        INSERT INTO hr_employee_cost_profile (
+            employee_id, date_from, %(columns)s,
+            create_uid, create_date, write_uid, write_date
+        )
+        SELECT emp.id, %%(baseline)s, %(values)s,
+               1, now() at time zone 'UTC', 1, now() at time zone 'UTC'
+          FROM hr_employee emp
+         WHERE NOT EXISTS (
+                SELECT 1
+                  FROM hr_employee_cost_profile profile
+                 WHERE profile.employee_id = emp.id
+               )
+    """ % {
+        'columns': ', '.join(COST_PROFILE_FIELDS),
+        'values': ', '.join('emp.%s' % column for column in COST_PROFILE_FIELDS),
+    }, {'baseline': COST_PROFILE_BASELINE_DATE})
+    _logger.info("Created %s baseline cost profiles", cr.rowcount)
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+"""
+Partners only keep the hash of their portal access token: drop the
+plaintext column. The stored hashes keep the issued links working.
+"""
+from odoo.tools.sql import column_exists
+
+
+def migrate(cr, version):
+    if not version or not column_exists(cr, 'res_partner', 'token'):
+        return
+    cr.execute("""
+        UPDATE res_partner
+           SET token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex')
+         WHERE token IS NOT NULL
+           AND token_hash IS NULL
+    """)
+    cr.execute("ALTER TABLE res_partner DROP COLUMN token")
@@ -1,7 +1,21 @@
 # -*- coding: utf-8 -*-
+from . import ir_sequence
+from . import ir_actions_report
+from . import document_reference
+from . import notification_dispatcher
+from . import mail_mail
+from . import tracking_policy
 from . import crm_enquiry
 from . import sales_enquiry
 from . import sale_order
 from . import project_project
 from . import account_move
-from . import hr_employee
\ No newline at end of file
+from . import attendance_time
+from . import hr_employee
+from . import hr_employee_cost_profile
+from . import attendance_punch
+from . import hr_attendance_period
+from . import hr_attendance_archive
+from . import hr_attendance_allocation
+from . import res_config_settings
+from . import dimension_propagation
@@ -11,13 +11,13 @@ class AccountMove(models.Model):
 
     sale_order_id = fields.Many2one('sale.order', string='Sale Order', tracking=True)
     enquiry_id = fields.Many2one('enquiry.lead', string='Enquiry', index=True, related="sale_order_id.enquiry_id",
-                                 tracking=True)
-    department_id = fields.Many2one("enquiry.department", string="Department", required=True,
-                                    related="enquiry_id.department_id", tracking=True)
+                                 store=True, tracking=True)
+    department_id = fields.Many2one("enquiry.department", string="Department",
+                                    compute='_compute_dimensions', store=True, index=True, tracking=True)
     enquiry_date = fields.Datetime(string="Enquiry Date", help="Date when the enquiry was created.",
                                    related="enquiry_id.create_date", store=True, tracking=True)
     client_id = fields.Many2one('res.partner', string='Company Name', domain="[('parent_id', '=', False)]",
-                                related="enquiry_id.client_id", tracking=True)
+                                compute='_compute_dimensions', store=True, index=True, tracking=True)
     contact_person_id = fields.Many2one('res.partner', string='Contact Name', domain="[('parent_id', '=', client_id)]",
                                         related="enquiry_id.contact_person_id", tracking=True)
     mobile = fields.Char(string="Contact No.", readonly=False,
@@ -37,14 +37,14 @@ class AccountMove(models.Model):
         ('low', 'Low'),
         ('medium', 'Medium'),
         ('high', 'High'),
-    ], string='Priority', tracking=True, related="enquiry_id.priority")
+    ], string='Priority', tracking=True, compute='_compute_dimensions', store=True, index=True)
     sector = fields.Selection([
         ('marine', 'Marine'),
         ('process', 'Process'),
         ('construction', 'Construction'),
         ('employment_agency', 'Employment Agency'),
-    ], string='Sector', related='client_id.sector', tracking=True)
-    enq_probability = fields.Float(string='Probability (%)', related="enquiry_id.enq_probability", tracking=True)
+    ], string='Sector', compute='_compute_dimensions', store=True, index=True, tracking=True)
+    enq_probability = fields.Float(string='Probability (%)', compute='_compute_dimensions', store=True, tracking=True)
     deadline = fields.Datetime(string="Deadline & Time", related='sale_order_id.deadline', tracking=True)
     project_id = fields.Many2one('project.project', string='Project Number', required=False,
                                  related="sale_order_id.project_id", tracking=True)
@@ -66,8 +66,8 @@ class AccountMove(models.Model):
     ], string="GST", default='9_percent', tracking=True)
     yeard_id = fields.Many2one('res.partner', string='Yeard', domain="[('parent_id', '=', False)]",
                                related='sale_order_id.yeard_id', tracking=True)
-    user_id = fields.Many2one('res.users', string='Sales Person', default=lambda self: self.env.user,
-                              related='enquiry_id.user_id', tracking=True)
+    user_id = fields.Many2one('res.users', string='Sales Person', compute='_compute_dimensions', store=True,
+                              index=True, tracking=True)
     calcification = fields.Selection([
         ('client', 'Client'),
         ('shipyard', 'Shipyard'),
@@ -77,7 +77,7 @@ class AccountMove(models.Model):
         ('process_plant', 'Process Plant'),
         ('construction', 'Construction'),
         ('power_plant', 'Power Plant'),
-    ], string='Calcification', related='enquiry_id.calcification', tracking=True)
+    ], string='Calcification', compute='_compute_dimensions', store=True, index=True, tracking=True)
     discount_type = fields.Selection([
         ('percent', 'Percentage'),
         ('amount', 'Amount'),
@@ -100,6 +100,19 @@ class AccountMove(models.Model):
         if self.discount_amt and self.service_amount and self.discount_amt > self.service_amount:
             raise ValidationError("Discount amount cannot be greater than the Total Amount!")
 
+    @api.depends('enquiry_id')
+    def _compute_dimensions(self):
+        # stored copies of the enquiry dimensions, upstream changes come from dimension.propagation.queue
+        for move in self:
+            enquiry = move.enquiry_id
+            move.client_id = enquiry.client_id
+            move.department_id = enquiry.department_id
+            move.user_id = enquiry.user_id
+            move.priority = enquiry.priority
+            move.calcification = enquiry.calcification
+            move.sector = enquiry.client_id.sector
+            move.enq_probability = enquiry.enq_probability
+
     @api.depends('invoice_line_ids.price_subtotal', 'discount_type', 'discount_percent', 'discount_amt', 'gst_type')
     def _compute_service_amounts(self):
         for rec in self:
@@ -127,36 +140,52 @@ class AccountMove(models.Model):
             rec.net_amount = net_amount
 
     def action_confirm_invoice(self):
-        """Custom confirm button to post the invoice with notification"""
-        for move in self:
-            if not move.invoice_line_ids:
-                raise UserError("Cannot confirm invoice without any invoice lines!")
-
-            # Post the invoice using Odoo's standard method
-            move.action_post()
-
-            # Update custom status
-            move.status_in_payment = 'posted'
-
-            # Send notification to the salesperson
-            if move.user_id:
-                message = f"Invoice {move.name} has been confirmed! Amount: {move.currency_id.symbol}{move.net_amount:.2f}"
-                self.env['bus.bus']._sendone(
-                    move.user_id.partner_id,
-                    'simple_notification',
-                    {
-                        'type': 'success',
-                        'message': message,
-                        'sticky': True,
-                        'className': 'bg-success',
-                    }
-                )
-
-            # Post message in chatter
-            move.message_post(
-                body=f"Invoice confirmed by {self.env.user.name} on {fields.Datetime.now()}",
-                subject="Invoice Confirmed"
+        """
+        Custom confirm button to post the invoices with notification.
+
+        Works on the whole selection at once: one post, one status write, the
+        chatter messages logged in batch and one summary per salesperson.
+        Only customer invoices are confirmed, bills and refunds are left as is.
+        """
+        invoices = self.filtered(lambda move: move.move_type == 'out_invoice')
+        if not invoices:
+            raise UserError("Only customer invoices can be confirmed here!")
+        if any(not move.invoice_line_ids for move in invoices):
+            raise UserError("Cannot confirm invoice without any invoice lines!")
+
+        # Post the invoices using Odoo's standard method
+        invoices.action_post()
+
+        # Update custom status
+        invoices.write({'status_in_payment': 'posted'})
+
+        # Send one notification to each salesperson
+        notifications = []
+        for user, moves in invoices.grouped('user_id').items():
+            if not user:
+                continue
+            invoice_names = ', '.join(
+                f"{move.name} ({move.currency_id.symbol}{move.net_amount:.2f})" for move in moves
             )
+            notifications.append((
+                user.partner_id,
+                'simple_notification',
+                {
+                    'type': 'success',
+                    'message': f"{len(moves)} invoice(s) have been confirmed! {invoice_names}",
+                    'sticky': True,
+                    'className': 'bg-success',
+                },
+            ))
+        if notifications:
+            self.env['notification.dispatcher']._queue_many(notifications)
+
+        # Log message in chatter
+        body = f"Invoice confirmed by {self.env.user.name} on {fields.Datetime.now()}"
+        invoices._message_log_batch(
+            bodies={move.id: body for move in invoices},
+            subject="Invoice Confirmed",
+        )
 
         # Show success notification
         return {
@@ -164,7 +193,7 @@ class AccountMove(models.Model):
             'tag': 'display_notification',
             'params': {
                 'title': _('Success!'),
-                'message': _('Invoice has been confirmed successfully!'),
+                'message': _('%s invoice(s) have been confirmed successfully!') % len(invoices),
                 'type': 'success',
                 'sticky': False,
             }
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from collections import defaultdict
+from datetime import datetime
+
+import pytz
+
+from odoo import api, fields, models, tools
+from odoo.exceptions import UserError, ValidationError
+
+PUNCH_BATCH_LIMIT = 1000
+
+
+class HrAttendancePunch(models.Model):
+    """
+    Raw punch received from a time clock, kept with the attendance it opened
+    or closed. ``punch_uid`` is the id supplied by the clock: a punch sent
+    twice is reported as a duplicate instead of being applied again.
+    """
+    _name = 'hr.attendance.punch'
+    _description = 'Attendance Punch'
+    _order = 'punch_time desc, id desc'
+
+    punch_uid = fields.Char(string="Punch ID", required=True, readonly=True)
+    employee_id = fields.Many2one('hr.employee', string="Employee", required=True, index=True, readonly=True,
+                                  ondelete='cascade')
+    project_id = fields.Many2one('project.project', string="Project", readonly=True)
+    punch_time = fields.Datetime(string="Punch Time", required=True, readonly=True)
+    direction = fields.Selection([('in', 'In'), ('out', 'Out')], string="Direction", required=True, readonly=True)
+    attendance_id = fields.Many2one('hr.attendance', string="Attendance", index='btree_not_null', readonly=True,
+                                    ondelete='set null')
+    state = fields.Selection([
+        ('applied', 'Applied'),
+        ('ignored', 'Ignored'),
+    ], string="Status", required=True, readonly=True)
+    note = fields.Char(string="Note", readonly=True)
+
+    _punch_uid_unique = models.Constraint('UNIQUE(punch_uid)', 'This punch has already been received.')
+
+    @api.model
+    def _ingest_punches(self, items):
+        """
+        Apply a batch of clock punches and return one result per item, in order:
+        ``{'punch_id', 'status', 'attendance_id', 'message'}`` where status is
+        ``applied``, ``ignored``, ``duplicate`` or ``error``.
+
+        Each item is a dict with ``punch_id``, ``employee_code``, ``timestamp``
+        (ISO 8601, UTC when naive), ``direction`` (``in``/``out``) and an
+        optional ``project_ref``. Punches are paired per employee in time
+        order, with the employee's open attendance if any, and the new
+        attendances are created with a single create.
+        """
+        results = [None] * len(items)
+        punches = self._parse_punches(items, results)
+
+        # idempotency: punches already received are reported, not applied again
+        known = {
+            punch.punch_uid: punch
+            for punch in self.search([('punch_uid', 'in', [punch['punch_uid'] for punch in punches])])
+        }
+        fresh = []
+        for punch in punches:
+            if punch['punch_uid'] in known:
+                previous = known[punch['punch_uid']]
+                results[punch['index']] = self._punch_result(
+                    punch['punch_uid'], 'duplicate', previous.attendance_id.id)
+            else:
+                fresh.append(punch)
+
+        Attendance = self.env['hr.attendance']
+        open_attendances = {
+            attendance.employee_id.id: attendance
+            for attendance in Attendance.search([
+                ('employee_id', 'in', list({punch['employee_id'] for punch in fresh})),
+                ('check_out', '=', False),
+            ])
+        }
+
+        new_attendances = []    # [(vals, [punches])]
+        check_outs = {}         # existing open attendance -> closing punch
+        by_employee = defaultdict(list)
+        for punch in fresh:
+            by_employee[punch['employee_id']].append(punch)
+        for employee_id, employee_punches in by_employee.items():
+            employee_punches.sort(key=lambda punch: punch['punch_time'])
+            current = open_attendances.get(employee_id)     # hr.attendance record or pending vals entry
+            for punch in employee_punches:
+                if punch['direction'] == 'in':
+                    if current is not None:
+                        punch['note'] = "Employee already checked in"
+                        continue
+                    employee = self.env['hr.employee'].browse(employee_id)
+                    local_tz = Attendance._get_local_tz(employee)
+                    current = ({
+                        'employee_id': employee_id,
+                        'project_id': punch['project_id'],
+                        'check_in': punch['punch_time'],
+                        'attendance_date': pytz.utc.localize(punch['punch_time']).astimezone(local_tz).date(),
+                    }, [punch])
+                    new_attendances.append(current)
+                    punch['state'] = 'applied'
+                elif current is None:
+                    punch['note'] = "No check-in to close"
+                elif isinstance(current, tuple):
+                    vals, paired = current
+                    if punch['punch_time'] <= vals['check_in']:
+                        punch['note'] = "Check-out before check-in"
+                        continue
+                    vals['check_out'] = punch['punch_time']
+                    vals['project_id'] = vals['project_id'] or punch['project_id']
+                    paired.append(punch)
+                    punch['state'] = 'applied'
+                    current = None
+                else:
+                    if punch['punch_time'] <= current.check_in:
+                        punch['note'] = "Check-out before check-in"
+                        continue
+                    check_outs[current] = punch
+                    punch['attendance_id'] = current.id
+                    punch['state'] = 'applied'
+                    current = None
+
+        self._create_punch_attendances(new_attendances)
+        for attendance, punch in check_outs.items():
+            self._apply_punch(punch, lambda attendance=attendance, punch=punch: attendance.write({
+                'check_out': punch['punch_time'],
+                'project_id': attendance.project_id.id or punch['project_id'],
+            }))
+
+        self.create([{
+            'punch_uid': punch['punch_uid'],
+            'employee_id': punch['employee_id'],
+            'project_id': punch['project_id'],
+            'punch_time': punch['punch_time'],
+            'direction': punch['direction'],
+            'attendance_id': punch.get('attendance_id', False),
+            'state': punch.get('state') or 'ignored',
+            'note': punch.get('note', False),
+        } for punch in fresh])
+        for punch in fresh:
+            results[punch['index']] = self._punch_result(
+                punch['punch_uid'], punch.get('state') or 'ignored', punch.get('attendance_id', False),
+                punch.get('note', ''))
+        return results
+
+    @api.model
+    def _parse_punches(self, items, results):
+        """Validate the items and resolve their employee and project, errors are written in ``results``"""
+        Employee = self.env['hr.employee']
+        Project = self.env['project.project']
+        punches = []
+        seen = set()
+        for index, item in enumerate(items):
+            item = item if isinstance(item, dict) else {}
+            punch_uid = item.get('punch_id') and str(item['punch_id'])
+            try:
+                if not punch_uid:
+                    raise UserError("Missing punch_id")
+                if punch_uid in seen:
+                    raise UserError("punch_id repeated in the batch")
+                if item.get('direction') not in ('in', 'out'):
+                    raise UserError("direction must be 'in' or 'out'")
+                punch_time = self._parse_punch_time(item.get('timestamp'))
+                employee_id = Employee._get_id_by_punch_code(str(item.get('employee_code') or ''))
+                if not employee_id:
+                    raise UserError("Unknown employee_code")
+                project_id = False
+                if item.get('project_ref'):
+                    project_id = Project._get_id_by_punch_ref(str(item['project_ref']))
+                    if not project_id:
+                        raise UserError("Unknown project_ref")
+            except UserError as e:
+                results[index] = self._punch_result(punch_uid, 'error', message=str(e))
+                continue
+            seen.add(punch_uid)
+            punches.append({
+                'index': index,
+                'punch_uid': punch_uid,
+                'employee_id': employee_id,
+                'project_id': project_id,
+                'punch_time': punch_time,
+                'direction': item['direction'],
+            })
+        return punches
+
+    @api.model
+    def _parse_punch_time(self, timestamp):
+        try:
+            punch_time = datetime.fromisoformat(timestamp)
+        except (TypeError, ValueError):
+            raise UserError("timestamp must be an ISO 8601 date and time")
+        if punch_time.tzinfo:
+            punch_time = punch_time.astimezone(pytz.utc).replace(tzinfo=None)
+        return punch_time.replace(microsecond=0)
+
+    @api.model
+    def _create_punch_attendances(self, new_attendances):
+        """Create the paired attendances at once, falling back per attendance to isolate the invalid ones"""
+        if not new_attendances:
+            return
+        Attendance = self.env['hr.attendance']
+        try:
+            with self.env.cr.savepoint():
+                attendances = Attendance.create([vals for vals, _punches in new_attendances])
+        except (UserError, ValidationError):
+            for vals, punches in new_attendances:
+                attendance = self._apply_punch(punches[0], lambda vals=vals: Attendance.create(vals))
+                for punch in punches:
+                    if attendance:
+                        punch['attendance_id'] = attendance.id
+                    else:
+                        punch.update(state='ignored', note=punches[0]['note'], attendance_id=False)
+            return
+        for attendance, (_vals, punches) in zip(attendances, new_attendances):
+            for punch in punches:
+                punch['attendance_id'] = attendance.id
+
+    @api.model
+    def _apply_punch(self, punch, operation):
+        """Run ``operation`` in a savepoint, an invalid punch is ignored with the error as note"""
+        try:
+            with self.env.cr.savepoint():
+                return operation()
+        except (UserError, ValidationError) as e:
+            punch['state'] = 'ignored'
+            punch['note'] = str(e)
+            punch['attendance_id'] = False
+            return None
+
+    @api.model
+    def _punch_result(self, punch_uid, status, attendance_id=False, message=''):
+        return {
+            'punch_id': punch_uid,
+            'status': status,
+            'attendance_id': attendance_id or False,
+            'message': message,
+        }
+
+
+class HrEmployee(models.Model):
+    _inherit = 'hr.employee'
+
+    @api.model
+    def _get_id_by_punch_code(self, code):
+        """Employee of ``code`` in the allowed companies, an error when several employees share it"""
+        if not code:
+            return False
+        company_ids = self.env.companies.ids
+        employee_ids = {
+            employee_id
+            for company_id in company_ids
+            for employee_id in self._get_punch_code_map(company_id).get(code, ())
+        } or set(self.sudo().search([('code', '=', code), ('company_id', 'in', company_ids)], limit=2).ids)
+        if len(employee_ids) > 1:
+            raise UserError("Ambiguous employee_code")
+        return employee_ids.pop() if employee_ids else False
+
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_punch_code_map(self, company_id):
+        """{employee code: (employee id, ...)} of a company for the time clock lookups, new codes are found by search"""
+        code_map = defaultdict(tuple)
+        for employee in self.sudo().search([('code', '!=', False), ('company_id', '=', company_id)]):
+            code_map[employee.code] += (employee.id,)
+        return dict(code_map)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        employees = super().create(vals_list)
+        # a new code may be shared with a cached employee, whose lookup must turn ambiguous
+        if any(employees.mapped('code')):
+            self.env.registry.clear_cache()
+        return employees
+
+    def _get_punch_code_key(self):
+        return {employee.id: (employee.code, employee.active, employee.company_id.id) for employee in self}
+
+    def write(self, vals):
+        if not {'code', 'active', 'company_id'}.intersection(vals):
+            return super().write(vals)
+        before = self._get_punch_code_key()
+        res = super().write(vals)
+        if any(key != before[employee_id] and (key[0] or before[employee_id][0])
+               for employee_id, key in self._get_punch_code_key().items()):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        coded = any(self.mapped('code'))
+        res = super().unlink()
+        if coded:
+            self.env.registry.clear_cache()
+        return res
+
+
+class ProjectProject(models.Model):
+    _inherit = 'project.project'
+
+    @api.model
+    def _get_id_by_punch_ref(self, project_ref):
+        """Project of ``project_ref`` in the allowed companies or shared, an error when several projects share it"""
+        company_ids = self.env.companies.ids + [False]
+        project_ids = {
+            project_id
+            for company_id in company_ids
+            for project_id in self._get_punch_ref_map(company_id).get(project_ref, ())
+        } or set(self.sudo().search([('project_ref', '=', project_ref), ('company_id', 'in', company_ids)],
+                                    limit=2).ids)
+        if len(project_ids) > 1:
+            raise UserError("Ambiguous project_ref")
+        return project_ids.pop() if project_ids else False
+
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_punch_ref_map(self, company_id):
+        """{project ref: (project id, ...)} of a company, or of the shared projects, for the time clock lookups"""
+        ref_map = defaultdict(tuple)
+        for project in self.sudo().search([('project_ref', 'not in', (False, 'New')), ('company_id', '=', company_id)]):
+            ref_map[project.project_ref] += (project.id,)
+        return dict(ref_map)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        projects = super().create(vals_list)
+        if any(ref not in (False, 'New') for ref in projects.mapped('project_ref')):
+            self.env.registry.clear_cache()
+        return projects
+
+    def _get_punch_ref_key(self):
+        return {
+            project.id: (project.project_ref not in (False, 'New') and project.project_ref, project.active,
+                         project.company_id.id)
+            for project in self
+        }
+
+    def write(self, vals):
+        if not {'project_ref', 'active', 'company_id'}.intersection(vals):
+            return super().write(vals)
+        before = self._get_punch_ref_key()
+        res = super().write(vals)
+        if any(key != before[project_id] and (key[0] or before[project_id][0])
+               for project_id, key in self._get_punch_ref_key().items()):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        referenced = any(ref not in (False, 'New') for ref in self.mapped('project_ref'))
+        res = super().unlink()
+        if referenced:
+            self.env.registry.clear_cache()
+        return res
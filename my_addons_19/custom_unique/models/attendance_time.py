@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from functools import lru_cache
+
+from odoo import models
+import pytz
+
+DEFAULT_ATTENDANCE_TZ = 'Asia/Kolkata'
+
+
+@lru_cache(maxsize=64)
+def _get_timezone(tz_name):
+    """Return the pytz zone for ``tz_name``, or None when the name is unknown."""
+    try:
+        return pytz.timezone(tz_name)
+    except pytz.UnknownTimeZoneError:
+        return None
+
+
+class AttendanceTimeFormatter(models.AbstractModel):
+    _name = 'attendance.time.formatter'
+    _description = 'Attendance Local Time Formatter'
+
+    def _get_default_attendance_tz_name(self):
+        return self.env['ir.config_parameter'].sudo().get_param(
+            'custom_unique.attendance_default_tz', DEFAULT_ATTENDANCE_TZ)
+
+    def _get_local_tz(self, employee=None):
+        """
+        Resolve the display timezone: employee, then current user, then company,
+        then the configured default (Asia/Kolkata when nothing is set).
+        """
+        company = employee.company_id if employee else self.env.company
+        for tz_name in (
+            employee.tz if employee else False,
+            self.env.user.tz,
+            company.partner_id.tz,
+            self._get_default_attendance_tz_name(),
+        ):
+            local_tz = tz_name and _get_timezone(tz_name)
+            if local_tz:
+                return local_tz
+        return _get_timezone(DEFAULT_ATTENDANCE_TZ)
+
+    def _localize_time(self, dt, local_tz):
+        if not dt:
+            return False
+        # If datetime is naive, make it UTC aware
+        if not dt.tzinfo:
+            dt = pytz.UTC.localize(dt)
+        return dt.astimezone(local_tz).strftime('%H:%M')
+
+    def convert_utc_to_local_time_only(self, dt, tz_name=None, employee=None):
+        """
+        Convert UTC datetime → local timezone → return only HH:MM string.
+
+        The timezone is ``tz_name`` when given, otherwise resolved from the
+        employee, the user or the company (see ``_get_local_tz``).
+        """
+        if not dt:
+            return False
+        local_tz = tz_name and _get_timezone(tz_name) or self._get_local_tz(employee)
+        return self._localize_time(dt, local_tz)
+
+    def _format_local_times(self, records, fnames=('check_in', 'check_out'), employee_field='employee_id'):
+        """
+        Batched version of ``convert_utc_to_local_time_only`` for a whole column.
+
+        Returns ``{record_id: {fname: 'HH:MM' or False}}``; the timezone is
+        resolved once per employee instead of once per value.
+        """
+        tz_by_employee = {}
+        result = {}
+        for record in records:
+            employee = record[employee_field] if employee_field else None
+            local_tz = tz_by_employee.get(employee.id if employee else False)
+            if local_tz is None:
+                local_tz = tz_by_employee[employee.id if employee else False] = self._get_local_tz(employee)
+            result[record.id] = {fname: self._localize_time(record[fname], local_tz) for fname in fnames}
+        return result
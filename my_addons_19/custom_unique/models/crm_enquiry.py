@@ -1,12 +1,37 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 from datetime import datetime
 from odoo.exceptions import ValidationError, UserError
 import uuid
+import hashlib
+from collections import OrderedDict
 import logging
-from odoo.tools import html2plaintext
+from odoo.tools import html2plaintext, str2bool
+
+CONFIRMATION_MAIL_SYNC_PARAM = 'custom_unique.partner_confirmation_mail_sync'
+APPROVAL_MAIL_SYNC_PARAM = 'custom_unique.partner_approval_mail_sync'
+PARTNER_MAIL_BATCH_LIMIT = 100
+# partner fields the cached boss directory is built from
+BOSS_DIRECTORY_FIELDS = {'is_boss', 'email', 'company_id', 'active'}
+
+TOKEN_CACHE_SIZE = 1024
+# (dbname, token hash) -> partner id, per worker
+_PARTNER_ID_BY_TOKEN_HASH = OrderedDict()
+
+PORTAL_PAGE_CACHE_SIZE = 256
+# partner fields rendered by the confirmation page
+PORTAL_PAGE_FIELDS = {
+    'name', 'email', 'phone', 'street', 'street2', 'city', 'state_id', 'zip', 'country_id', 'user_id',
+    'company_id', 'sector', 'approved_by_boss', 'blocked_by_boss', 'token_hash',
+}
+# (dbname, partner id, write_date, uid, lang, session hash) -> rendered confirmation page, per worker
+_PORTAL_PAGE_CACHE = OrderedDict()
+
+
+def _hash_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
 
 _logger = logging.getLogger(__name__)
 
@@ -15,7 +40,11 @@ class EnquiryLead(models.Model):
     _name = "enquiry.lead"
     _description = "Enquiry/Lead"
     _rec_name = 'name'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'document.reference.mixin']
+
+    _reference_field = 'enquiry_ref'
+    _reference_sequence_code = 'enquiry.lead'
+    _reference_doc_code = 'LEAD'
 
     enquiry_ref = fields.Char(string="Enquiry Reference", readonly=True, copy=False, index=True, default='New', tracking=True)
     name = fields.Char(string="", tracking=True)
@@ -81,11 +110,12 @@ class EnquiryLead(models.Model):
     notes = fields.Text(string='Notes', tracking=True)
     department_id = fields.Many2one("enquiry.department", string="Department", required=True, tracking=True)
     token = fields.Char(string="Access Token", copy=False, readonly=False, tracking=True)
-    sale_enquiry_count = fields.Integer(compute='_compute_sale_enquiry_count', tracking=True)
+    sale_enquiry_ids = fields.One2many('sale.enquiry', 'enquiry_id', string='Sale Enquiries')
+    sale_enquiry_count = fields.Integer(compute='_compute_sale_enquiry_count', store=True)
     sale_enquiry_id = fields.Many2one('sale.enquiry', string='Enquiry', index=True, store=True, tracking=True)
 
     def send_gom_notification(self):
-        self.env['bus.bus']._sendone(
+        self.env['notification.dispatcher']._queue(
             self.env.user.partner_id,
             "gom_channel",
             {
@@ -95,25 +125,22 @@ class EnquiryLead(models.Model):
         )
         return True
 
+    def _get_reference_company_department(self, vals_list):
+        # company_id is related to the client, so read it from the partners in one go
+        clients = self.env['res.partner'].browse({vals['client_id'] for vals in vals_list if vals.get('client_id')})
+        client_companies = {client.id: client.company_id.id for client in clients}
+        return [
+            (client_companies.get(vals.get('client_id')), vals.get('department_id'))
+            for vals in vals_list
+        ]
+
     @api.model_create_multi
     def create(self, vals_list):
-        records = super().create(vals_list)
-        for record in records:
-            if not record.token:
-                record.token = str(uuid.uuid4())
-            if record.enquiry_ref == 'New' or not record.enquiry_ref:
-                company = record.company_id
-                dept = record.department_id
-                current_year = datetime.now().year
-                seq_code = self.env['ir.sequence'].next_by_code('enquiry.lead') or '001'
-
-                company_code = company.code if company else 'CMP'
-                dept_code = dept.code if dept else 'DEPT'
-
-                record.enquiry_ref = (
-                    f"{company_code}-LEAD-{dept_code}-{current_year}-{seq_code.split('-')[-1]}"
-                )
-        return records
+        for vals in vals_list:
+            if not vals.get('token'):
+                vals['token'] = str(uuid.uuid4())
+        self._assign_references(vals_list)
+        return super().create(vals_list)
 
     def write(self, vals):
         print("\n\n\n\n\n\n\n\nValue is.....", vals)
@@ -147,10 +174,13 @@ class EnquiryLead(models.Model):
             text = re.sub(r',+', ', ', text)
             self.mobile = text
 
+    @api.depends('sale_enquiry_ids')
     def _compute_sale_enquiry_count(self):
+        # stored: counted for every user, not under the record rules of the one recomputing
+        counts = dict(self.env['sale.enquiry'].sudo()._read_group(
+            [('enquiry_id', 'in', self.ids)], ['enquiry_id'], ['__count']))
         for rec in self:
-            sale_enquiry = self.env['sale.enquiry'].search_count([('enquiry_id', '=', rec.id)])
-            self.sale_enquiry_count = sale_enquiry
+            rec.sale_enquiry_count = counts.get(rec._origin, 0)
 
     def action_view_sale_enquiry(self):
         self.ensure_one()
@@ -237,7 +267,8 @@ class ResPartner(models.Model):
     is_boss = fields.Boolean(string="Is Boss", help="Check if this partner is a Boss", tracking=True)
     approved_by_boss = fields.Boolean(string="Approved by Boss",help="Indicates whether this partner has been approved by the boss", tracking=True)
     blocked_by_boss = fields.Boolean(string="Blocked by Boss",help="Indicates whether this partner has been blocked by the boss", tracking=True)
-    token = fields.Char(string="Access Token", copy=False, readonly=False, tracking=True)
+    # only the hash of the portal access token is stored, see _issue_portal_token
+    token_hash = fields.Char(string="Access Token Hash", copy=False, readonly=True, groups='base.group_system')
     user_id = fields.Many2one(
         'res.users',string='Salesperson',compute='_compute_user_id',
         precompute=True,
@@ -275,10 +306,7 @@ class ResPartner(models.Model):
                 raise_if_not_found=False
             )
             if template:
-                boss = self.env['res.partner'].sudo().search([
-                    ('is_boss', '=', True),
-                    ('email', '!=', False)
-                ], limit=1)
+                boss = self._get_boss_directory(partner.company_id)['partner'].sudo()
 
                 if boss:
                     email_values = {
@@ -290,11 +318,7 @@ class ResPartner(models.Model):
                         'boss_name': boss.name or 'Boss',
                     }
 
-                    template.sudo().with_context(ctx).send_mail(
-                        partner.id,
-                        email_values=email_values,
-                        force_send=True
-                    )
+                    partner.sudo()._send_partner_mail(template.sudo(), email_values, ctx, APPROVAL_MAIL_SYNC_PARAM)
 
             if partner.user_id:
                 message = (
@@ -302,7 +326,7 @@ class ResPartner(models.Model):
                     f"'{partner.name}' is approved by the Boss!"
                 )
 
-                self.env['bus.bus']._sendone(
+                self.env['notification.dispatcher']._queue(
                     partner.user_id.partner_id,
                     'simple_notification',
                     {
@@ -332,7 +356,7 @@ class ResPartner(models.Model):
                     f"Hello {partner.user_id.name}, your partner "
                     f"'{partner.name}' is rejected by the Boss."
                 )
-                self.env['bus.bus']._sendone(
+                self.env['notification.dispatcher']._queue(
                     partner.user_id.partner_id,
                     'simple_notification',
                     {
@@ -359,6 +383,49 @@ class ResPartner(models.Model):
                 else:
                     record.phone = f"+{code}"
 
+    _token_hash_unique = models.Constraint(
+        'UNIQUE(token_hash)',
+        "The access token of a partner must be unique.",
+    )
+
+    def _issue_portal_token(self):
+        """
+        Return a new portal access token of the partner. The token itself is
+        not stored, only its hash: links issued before stop working.
+        """
+        self.ensure_one()
+        token = str(uuid.uuid4())
+        self.sudo().write({'token_hash': _hash_token(token)})
+        return token
+
+    @api.model
+    def _get_partner_by_token(self, token):
+        """
+        Partner of a portal access token, or an empty recordset. The token is
+        looked up by its hash on the unique index, and the hash -> partner id
+        mapping is kept in a small per-worker LRU.
+        """
+        if not token:
+            return self.browse()
+        token_hash = _hash_token(token)
+        cache_key = (self.env.cr.dbname, token_hash)
+        partner_id = _PARTNER_ID_BY_TOKEN_HASH.get(cache_key)
+        if partner_id:
+            _PARTNER_ID_BY_TOKEN_HASH.move_to_end(cache_key)
+            partner = self.sudo().browse(partner_id).exists()
+            # the cached id is stale when a new token was issued since
+            if partner and partner.token_hash != token_hash:
+                partner = self.browse()
+        else:
+            partner = self.sudo().search([('token_hash', '=', token_hash)], limit=1)
+        if not partner:
+            _PARTNER_ID_BY_TOKEN_HASH.pop(cache_key, None)
+            return self.browse()
+        _PARTNER_ID_BY_TOKEN_HASH[cache_key] = partner.id
+        if len(_PARTNER_ID_BY_TOKEN_HASH) > TOKEN_CACHE_SIZE:
+            _PARTNER_ID_BY_TOKEN_HASH.popitem(last=False)
+        return self.browse(partner.id)
+
     def _compute_display_name(self):
         for partner in self:
             partner.display_name = partner.name or ''
@@ -368,9 +435,6 @@ class ResPartner(models.Model):
     def create(self, vals_list):
         records = super().create(vals_list)
         for record in records:
-            if not record.token:
-                record.token = str(uuid.uuid4())
-                print("\n\n\n\n\n\n\n=====>>>>", record.token)
             if record.parent_id:
                 print("Record.Parent_id is....", record.parent_id)
                 record.sector = record.parent_id.sector
@@ -382,29 +446,124 @@ class ResPartner(models.Model):
                 record._send_boss_email()
         return records
 
+    def write(self, vals):
+        # the boss directory only changes when a watched value of a (future) boss changes
+        watched = sorted(BOSS_DIRECTORY_FIELDS.intersection(vals))
+        bosses = (self if vals.get('is_boss') else self.filtered('is_boss')) if watched else self.browse()
+        before = {partner.id: [partner[fname] for fname in watched] for partner in bosses}
+        res = super().write(vals)
+        if any(before[partner.id] != [partner[fname] for fname in watched] for partner in bosses):
+            self.env.registry.clear_cache()
+        if PORTAL_PAGE_FIELDS.intersection(vals):
+            self._invalidate_portal_page_cache()
+        return res
+
+    def _invalidate_portal_page_cache(self):
+        # entries are keyed by write_date, this only frees the outdated pages of this worker early
+        dbname, partner_ids = self.env.cr.dbname, set(self.ids)
+        for key in [key for key in _PORTAL_PAGE_CACHE if key[0] == dbname and key[1] in partner_ids]:
+            _PORTAL_PAGE_CACHE.pop(key, None)
+
+    def unlink(self):
+        bosses = self.filtered('is_boss')
+        res = super().unlink()
+        if bosses:
+            self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_boss_directory_ids(self, company_id):
+        """
+        Cached ``(boss_partner_id, boss_user_id, approver_user_ids, boss_user_ids)``
+        of a company, preferring a boss of the company over a shared one.
+        Cleared on ``is_boss`` and boss group membership changes.
+        """
+        boss_partners = self.sudo().search([
+            ('is_boss', '=', True),
+            ('email', '!=', False),
+            ('company_id', 'in', [company_id, False]),
+        ])
+        boss_partner = boss_partners.filtered(lambda p: p.company_id.id == company_id)[:1] or boss_partners[:1]
+        Users = self.env['res.users'].sudo()
+        boss_user = Users.search([('partner_id', '=', boss_partner.id)], limit=1) if boss_partner else Users
+        approvers = self.env.ref('custom_unique.group_unique_administrator').sudo().user_ids
+        bosses = Users.search([('is_boss', '=', True)])
+        return boss_partner.id, boss_user.id, tuple(approvers.ids), tuple(bosses.ids)
+
+    @api.model
+    def _get_boss_directory(self, company=None):
+        """
+        The approvers of ``company`` (default: current company), without queries once cached:
+        ``partner``/``user`` of the boss receiving partner mails, the ``approvers``
+        of the boss group and all ``bosses`` users.
+        """
+        partner_id, user_id, approver_ids, boss_ids = self._get_boss_directory_ids((company or self.env.company).id)
+        Users = self.env['res.users']
+        return {
+            'partner': self.browse(partner_id),
+            'user': Users.browse(user_id),
+            'approvers': Users.browse(approver_ids),
+            'bosses': Users.browse(boss_ids),
+        }
+
     def portal_url(self):
-        """Redirect to the portal page using a secure token."""
+        """Redirect to the portal page using a freshly issued secure token."""
         self.ensure_one()
         base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
-        url = f"{base_url}/partner/confirmation/{self.token}"
+        url = f"{base_url}/partner/confirmation/{self._issue_portal_token()}"
         return {
             'type': 'ir.actions.act_url',
             'target': 'new',
             'url': url,
         }
 
+    def _send_partner_mail(self, template, email_values, ctx, sync_param):
+        """
+        Queue ``template`` for this partner and let the partner mail cron send
+        it, so no SMTP round trip happens in the request. Sent right away only
+        when the flow's ``sync_param`` setting asks for synchronous delivery.
+        """
+        self.ensure_one()
+        force_send = str2bool(self.env['ir.config_parameter'].sudo().get_param(sync_param, 'False'))
+        # tagged for the partner mail cron, which also retries a failed synchronous send
+        email_values = dict(email_values, partner_mail_queued=True)
+        template.with_context(ctx).send_mail(self.id, email_values=email_values, force_send=force_send)
+        if not force_send:
+            self._trigger_partner_mail_queue()
+
+    @api.model
+    def _trigger_partner_mail_queue(self):
+        # one trigger per transaction is enough for any number of queued mails
+        if self.env.cr.precommit.data.get('custom_unique.partner_mail_triggered'):
+            return
+        self.env.cr.precommit.data['custom_unique.partner_mail_triggered'] = True
+        cron = self.env.ref('custom_unique.ir_cron_partner_mail_queue', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    @api.model
+    def _process_partner_mail_queue(self):
+        """Cron: send the queued partner confirmation/approval mails ahead of the general mail queue"""
+        mails = self.env['mail.mail'].search([
+            ('state', '=', 'outgoing'),
+            ('partner_mail_queued', '=', True),
+        ], limit=PARTNER_MAIL_BATCH_LIMIT)
+        if not mails:
+            return
+        self.env['mail.mail'].process_email_queue(email_ids=mails.ids)
+        if len(mails) == PARTNER_MAIL_BATCH_LIMIT:
+            self.env.ref('custom_unique.ir_cron_partner_mail_queue')._trigger()
+
     def _send_boss_email(self):
         # Template
         template = self.env.ref('custom_unique.partner_confirmation_mail_template', raise_if_not_found=False)
         if not template:
             return
 
-        boss_partner = self.search([('is_boss', '=', True), ('email', '!=', False)], limit=1)
-        if not boss_partner:
-            return
-
-        boss_user = self.env['res.users'].search([('partner_id', '=', boss_partner.id)], limit=1)
-        if not boss_user:
+        directory = self._get_boss_directory(self.company_id)
+        boss_partner, boss_user = directory['partner'], directory['user']
+        if not boss_partner or not boss_user:
             return
 
         # Create Backend Form URL for this Partner
@@ -419,12 +578,12 @@ class ResPartner(models.Model):
             'boss_name': boss_partner.name or 'Boss',
             'partner_link': partner_link,
         }
-        template.with_context(ctx).send_mail(self.id, email_values=email_values, force_send=True)
+        self._send_partner_mail(template, email_values, ctx, CONFIRMATION_MAIL_SYNC_PARAM)
 
         # --- Real-time Notification ---
         message = f"Hello {boss_partner.name}! Approval is required for partner <a href='{partner_link}' target='_blank'>{self.name}</a>."
 
-        self.env["bus.bus"]._sendone(
+        self.env["notification.dispatcher"]._queue(
             boss_user.partner_id,
             "simple_notification",
             {
@@ -485,18 +644,47 @@ class ResUsers(models.Model):
 
     @api.model_create_multi
     def create(self, vals_list):
-        user = super(ResUsers, self.with_context(skip_boss_email=True)).create(vals_list)
-        if 'is_boss' in vals_list:
-            user.partner_id.is_boss = vals_list['is_boss']
-        return user
+        directory_before = self._get_boss_directory_key()
+        users = super(ResUsers, self.with_context(skip_boss_email=True)).create(vals_list)
+        for user, vals in zip(users, vals_list):
+            if 'is_boss' in vals:
+                user.partner_id.is_boss = vals['is_boss']
+        # e.g. a user created as admin by _onchange_role is a new approver
+        self._clear_boss_directory(directory_before)
+        return users
 
     def write(self, vals):
+        directory_before = self._get_boss_directory_key() \
+            if {'is_boss', 'group_ids', 'active'}.intersection(vals) else None
         res = super(ResUsers, self).write(vals)
         if 'is_boss' in vals:
-            for user in self:
-                user.partner_id.is_boss = vals['is_boss']
+            self.partner_id.write({'is_boss': vals['is_boss']})
+        if directory_before is not None:
+            self._clear_boss_directory(directory_before)
+        return res
+
+    def unlink(self):
+        directory_before = self._get_boss_directory_key()
+        res = super().unlink()
+        self._clear_boss_directory(directory_before)
         return res
 
+    @api.model
+    def _get_boss_approver_ids(self):
+        group = self.env.ref('custom_unique.group_unique_administrator', raise_if_not_found=False)
+        # searched rather than read from group.user_ids, whose cache still holds archived users
+        return frozenset(self.sudo().search([('group_ids', 'in', group.id)]).ids) if group else frozenset()
+
+    @api.model
+    def _get_boss_directory_key(self):
+        """Active boss users and approvers, as cached in res.partner._get_boss_directory_ids"""
+        return frozenset(self.sudo().search([('is_boss', '=', True)]).ids), self._get_boss_approver_ids()
+
+    @api.model
+    def _clear_boss_directory(self, directory_before):
+        if directory_before != self._get_boss_directory_key():
+            self.env.registry.clear_cache()
+
     @api.onchange('country_id')
     def _onchange_phone_add_code(self):
         for record in self:
@@ -512,3 +700,14 @@ class ResUsers(models.Model):
                     record.phone = f"+{code}"
 
 
+class ResGroups(models.Model):
+    _inherit = 'res.groups'
+
+    def write(self, vals):
+        Users = self.env['res.users']
+        approvers_before = Users._get_boss_approver_ids() if 'user_ids' in vals else None
+        res = super().write(vals)
+        if approvers_before is not None and approvers_before != Users._get_boss_approver_ids():
+            # boss approvers are cached in res.partner._get_boss_directory_ids
+            self.env.registry.clear_cache()
+        return res
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from collections import defaultdict
+
+from odoo import api, fields, models
+from odoo.fields import Domain
+from odoo.tools import split_every
+
+ENQUIRY_DIMENSION_SOURCES = {
+    'enquiry.lead': ('enquiry_id', {
+        'client_id', 'department_id', 'user_id', 'priority', 'calcification', 'enq_probability',
+    }),
+    'res.partner': ('client_id', {'sector'}),
+}
+ENQUIRY_DIMENSION_FIELDS = [
+    'client_id', 'department_id', 'user_id', 'priority', 'calcification', 'sector', 'enq_probability',
+]
+
+# Stored dimension copies, per target model: the copied fields, and for each source
+# model the target field pointing to it and the source fields the copies are made of.
+DIMENSION_TARGETS = {
+    'hr.attendance': {
+        'fields': [
+            'employee_code', 'sector', 'designation_id', 'emp_working_dept', 'employee_department',
+            'company_id', 'company_code', 'project_ref', 'vessel_name', 'client_id',
+        ],
+        'sources': {
+            'hr.employee': ('employee_id', {'code', 'sector', 'job_id', 'department_id', 'company_id'}),
+            'project.project': ('project_id', {'project_ref', 'name', 'client_id'}),
+            'hr.department': ('emp_working_dept', {'name'}),
+            'res.company': ('company_id', {'code'}),
+        },
+    },
+    'sale.enquiry': {'fields': ENQUIRY_DIMENSION_FIELDS, 'sources': ENQUIRY_DIMENSION_SOURCES},
+    'sale.order': {'fields': ENQUIRY_DIMENSION_FIELDS, 'sources': ENQUIRY_DIMENSION_SOURCES},
+    'account.move': {'fields': ENQUIRY_DIMENSION_FIELDS, 'sources': ENQUIRY_DIMENSION_SOURCES},
+}
+
+
+class DimensionPropagationQueue(models.Model):
+    """
+    Records whose changes must be copied on the stored dimensions of the
+    records pointing to them (see DIMENSION_TARGETS). A cron recomputes the
+    affected records in batches, so editing an employee, a project, an enquiry
+    or a client never rewrites its attendances, orders or invoices inline.
+    """
+    _name = 'dimension.propagation.queue'
+    _description = 'Dimension Propagation Queue'
+    _log_access = False
+
+    res_model = fields.Char(string="Model", required=True)
+    res_id = fields.Integer(string="Record ID", required=True)
+
+    @api.model
+    def _enqueue(self, records):
+        if not records:
+            return
+        self.sudo().create([{'res_model': records._name, 'res_id': record_id} for record_id in records.ids])
+        # one trigger per transaction is enough for any number of entries
+        if not self.env.cr.precommit.data.get('custom_unique.dimension_propagation_triggered'):
+            self.env.cr.precommit.data['custom_unique.dimension_propagation_triggered'] = True
+            cron = self.env.ref('custom_unique.ir_cron_dimension_propagation', raise_if_not_found=False)
+            if cron:
+                cron.sudo()._trigger()
+
+    @api.model
+    def _process_queue(self, batch_size=1000):
+        """Cron: recompute the stored dimensions of the records pointing to queued records"""
+        entries = self.search([])
+        if not entries:
+            return
+        ids_by_model = defaultdict(set)
+        for entry in entries:
+            ids_by_model[entry.res_model].add(entry.res_id)
+
+        for target_model, target in DIMENSION_TARGETS.items():
+            domains = [
+                Domain(link_field, 'in', list(ids_by_model[source_model]))
+                for source_model, (link_field, _source_fields) in target['sources'].items()
+                if ids_by_model.get(source_model)
+            ]
+            if domains:
+                self._recompute_dimensions(target_model, target['fields'], Domain.OR(domains), batch_size)
+        entries.unlink()
+
+    @api.model
+    def _recompute_dimensions(self, model_name, fnames, domain, batch_size):
+        Model = self.env[model_name].sudo().with_context(active_test=False, mail_notrack=True)
+        dimension_fields = [Model._fields[fname] for fname in fnames]
+        for batch_ids in split_every(batch_size, Model.search(domain).ids):
+            records = Model.browse(batch_ids)
+            for field in dimension_fields:
+                self.env.add_to_compute(field, records)
+            records.flush_recordset(fnames)
+            self.env.invalidate_all()
+
+
+class DimensionSourceMixin(models.AbstractModel):
+    _name = 'dimension.source.mixin'
+    _description = 'Dimension Propagation Source'
+
+    def write(self, vals):
+        res = super().write(vals)
+        if any(
+            target['sources'][self._name][1].intersection(vals)
+            for target in DIMENSION_TARGETS.values() if self._name in target['sources']
+        ):
+            self.env['dimension.propagation.queue']._enqueue(self)
+        return res
+
+
+class HrEmployee(models.Model):
+    _name = 'hr.employee'
+    _inherit = ['hr.employee', 'dimension.source.mixin']
+
+
+class ProjectProject(models.Model):
+    _name = 'project.project'
+    _inherit = ['project.project', 'dimension.source.mixin']
+
+
+class HrDepartment(models.Model):
+    _name = 'hr.department'
+    _inherit = ['hr.department', 'dimension.source.mixin']
+
+
+class ResCompany(models.Model):
+    _name = 'res.company'
+    _inherit = ['res.company', 'dimension.source.mixin']
+
+
+class EnquiryLead(models.Model):
+    _name = 'enquiry.lead'
+    _inherit = ['enquiry.lead', 'dimension.source.mixin']
+
+
+class ResPartner(models.Model):
+    _name = 'res.partner'
+    _inherit = ['res.partner', 'dimension.source.mixin']
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from odoo import models, _
+from collections import defaultdict
+from datetime import datetime
+
+
+class DocumentReferenceMixin(models.AbstractModel):
+    """
+    Builds ``{company_code}-{doc_code}-{dept_code}-{year}-{seq}`` references in
+    the create values, so a multi-create reserves all its numbers in one
+    sequence call and needs no UPDATE afterwards.
+
+    Numbers come from one sequence per rendered company code, department code
+    and year, which is what the reference is made unique on, so unrelated
+    creates never contend and equal prefixes never get the same number.
+    """
+    _name = 'document.reference.mixin'
+    _description = 'Document Reference Allocation'
+
+    _reference_field = False
+    _reference_sequence_code = False
+    _reference_doc_code = False
+    _reference_use_department = True
+    _reference_default_number = '001'
+
+    def _get_reference_company_department(self, vals_list):
+        """Return one ``(company_id, department_id)`` pair per create values dict."""
+        return [(vals.get('company_id'), vals.get('department_id')) for vals in vals_list]
+
+    def _assign_references(self, vals_list):
+        pending = [
+            vals for vals in vals_list
+            if (vals.get(self._reference_field) or 'New') in ('New', _('New'))
+        ]
+        if not pending:
+            return vals_list
+
+        keys = self._get_reference_company_department(pending)
+        companies = self.env['res.company'].browse({company_id for company_id, _dept_id in keys if company_id})
+        departments = self.env['enquiry.department'].browse({dept_id for _company_id, dept_id in keys if dept_id})
+        company_codes = {company.id: company.code for company in companies}
+        dept_codes = {dept.id: dept.code for dept in departments}
+
+        current_year = datetime.now().year
+        vals_by_partition = defaultdict(list)
+        for vals, (company_id, dept_id) in zip(pending, keys):
+            dept_code = dept_codes.get(dept_id) if self._reference_use_department else False
+            vals_by_partition[(company_codes.get(company_id) or False, dept_code or False)].append(vals)
+
+        IrSequence = self.env['ir.sequence']
+        for (company_code, dept_code), partition_vals in vals_by_partition.items():
+            seq_codes = IrSequence._next_block_by_partition(
+                self._reference_sequence_code,
+                self._get_reference_partition(company_code, dept_code, current_year),
+                len(partition_vals),
+                seed=lambda env, company_code=company_code, dept_code=dept_code:
+                    env[self._name]._get_reference_max_number(company_code, dept_code, current_year),
+            )
+            if not seq_codes:
+                seq_codes = [self._reference_default_number] * len(partition_vals)
+            prefix = self._get_reference_prefix(company_code, dept_code, current_year)
+            for vals, seq_code in zip(partition_vals, seq_codes):
+                vals[self._reference_field] = prefix + seq_code.split('-')[-1]
+        return vals_list
+
+    def _get_reference_prefix(self, company_code, dept_code, year):
+        parts = [company_code or 'CMP', self._reference_doc_code]
+        if self._reference_use_department:
+            parts.append(dept_code or 'DEPT')
+        return '-'.join(parts + [str(year), ''])
+
+    def _get_reference_partition(self, company_code, dept_code, year):
+        """The reference prefix without the document code: the sequence partition of the references"""
+        parts = [company_code or 'CMP']
+        if self._reference_use_department:
+            parts.append(dept_code or 'DEPT')
+        return '-'.join(parts + [str(year)])
+
+    def _get_reference_max_number(self, company_code, dept_code, year):
+        """
+        Highest number already issued in a partition, over every model drawing
+        from the same sequence (quotations share the sale enquiry numbers).
+        """
+        max_number = 0
+        for model_class in self.env.registry.values():
+            if model_class._abstract or not getattr(model_class, '_reference_field', False) \
+                    or model_class._reference_sequence_code != self._reference_sequence_code:
+                continue
+            Model = self.env[model_class._name]
+            prefix = Model._get_reference_prefix(company_code, dept_code, year)
+            self.env.cr.execute("""
+                SELECT MAX(substring(%(column)s FROM %%(start)s)::bigint)
+                  FROM %(table)s
+                 WHERE left(%(column)s, %%(length)s) = %%(prefix)s
+                   AND substring(%(column)s FROM %%(start)s) ~ '^[0-9]+$'
+            """ % {'table': Model._table, 'column': Model._reference_field},
+                {'prefix': prefix, 'length': len(prefix), 'start': len(prefix) + 1})
+            max_number = max(max_number, self.env.cr.fetchone()[0] or 0)
+        return max_number
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from collections import defaultdict
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.tools import date_utils
+
+ALLOCATION_FIELDS = [
+    'cpf_amount', 'levy_amount', 'accomodation_amount', 'transportation_amount', 'insurance_amount',
+    'admin_cost_amount', 'certification_audit_cost_amount', 'office_rent_amount', 'oh_cost_amount',
+    'others_cost_amount',
+]
+
+
+class HrAttendanceAllocation(models.Model):
+    """
+    Per-day share of the monthly overhead costs of an employee from
+    ``date_from`` to ``date_to``: the costs of the profile in effect on
+    ``date_from`` divided by the working days of the month. A month has one
+    allocation per cost profile in effect during it. Attendances read their
+    overhead amounts from the allocation of their date, so a new working day
+    updates the allocations of one month instead of every attendance.
+    """
+    _name = 'hr.attendance.allocation'
+    _description = 'Attendance Overhead Allocation'
+    _order = 'month desc, employee_id, date_from'
+
+    employee_id = fields.Many2one('hr.employee', string="Employee", required=True, index=True, ondelete='cascade',
+                                  readonly=True)
+    month = fields.Date(string="Month", required=True, readonly=True)
+    date_from = fields.Date(string="Effective From", required=True, readonly=True)
+    date_to = fields.Date(string="Effective To", required=True, readonly=True)
+    currency_id = fields.Many2one(related='employee_id.currency_id')
+    working_days = fields.Integer(string="Working Days", readonly=True)
+    cpf_amount = fields.Monetary(string="CPF", readonly=True)
+    levy_amount = fields.Monetary(string="Levy", readonly=True)
+    accomodation_amount = fields.Monetary(string="Accommodation", readonly=True)
+    transportation_amount = fields.Monetary(string="Transportation", readonly=True)
+    insurance_amount = fields.Monetary(string="Insurance", readonly=True)
+    admin_cost_amount = fields.Monetary(string="Admin Cost", readonly=True)
+    certification_audit_cost_amount = fields.Monetary(string="Certification / Audit Cost", readonly=True)
+    office_rent_amount = fields.Monetary(string="Office Rent", readonly=True)
+    oh_cost_amount = fields.Monetary(string="OH Cost", readonly=True)
+    others_cost_amount = fields.Monetary(string="Others", readonly=True)
+    total_amount = fields.Monetary(string="Total per Day", compute='_compute_total_amount', store=True)
+
+    _employee_month_unique = models.Constraint(
+        'UNIQUE(employee_id, month, date_from)',
+        'An employee has one overhead allocation per month and cost profile.',
+    )
+
+    @api.depends(*ALLOCATION_FIELDS)
+    def _compute_total_amount(self):
+        for allocation in self:
+            allocation.total_amount = sum(allocation[fname] for fname in ALLOCATION_FIELDS)
+
+    @api.model
+    def _get_allocation_map(self, keys):
+        """Return {(employee id, first day of month): allocations sorted by date_from} of the given keys"""
+        if not keys:
+            return {}
+        allocations = self.sudo().search([
+            ('employee_id', 'in', list({employee_id for employee_id, _month in keys})),
+            ('month', 'in', list({month for _employee_id, month in keys})),
+        ], order='date_from')
+        allocation_map = {}
+        for allocation in allocations:
+            key = (allocation.employee_id.id, allocation.month)
+            if key in keys:
+                allocation_map[key] = allocation_map.get(key, self.browse()) | allocation
+        return allocation_map
+
+    @api.model
+    def _get_allocation_at(self, allocation_map, employee_id, on_date):
+        """Allocation of ``employee_id`` in effect on ``on_date`` in ``allocation_map``, None if missing"""
+        for allocation in reversed(allocation_map.get((employee_id, on_date.replace(day=1)), self.browse())):
+            if allocation.date_from <= on_date:
+                return allocation
+        return None
+
+    @api.model
+    def _get_locked_keys(self, keys, employees):
+        """
+        The (employee id, first day of month) ``keys`` with attendances in a
+        closed period, with the lock key of hr.attendance._get_locked_attendances:
+        the attendance company, or the employee company.
+        """
+        locked_months = self.env['hr.attendance.period']._get_locked_months()
+        if not locked_months:
+            return set()
+        months = {month for _employee_id, month in keys}
+        companies = defaultdict(set)
+        for employee, company, month in self.env['hr.attendance'].sudo()._read_group([
+            ('employee_id', 'in', list(employees)),
+            ('attendance_date', '>=', min(months)),
+            ('attendance_date', '<=', date_utils.end_of(max(months), 'month')),
+        ], ['employee_id', 'company_id', 'attendance_date:month']):
+            companies[(employee.id, month)].add((company or employee.company_id).id)
+        return {
+            (employee_id, month) for employee_id, month in keys
+            if employee_id in employees and any(
+                (company_id, month) in locked_months
+                for company_id in companies.get((employee_id, month)) or {employees[employee_id].company_id.id}
+            )
+        }
+
+    @api.model
+    def _refresh_allocations(self, keys, profile_index=None):
+        """
+        Recompute the allocations of the (employee id, first day of month)
+        ``keys``, one per cost profile in effect during the month. Months
+        closed by an hr.attendance.period keep theirs.
+        """
+        keys = set(keys)
+        if not keys:
+            return
+        CostProfile = self.env['hr.employee.cost.profile']
+        employees = {
+            employee.id: employee
+            for employee in self.env['hr.employee'].browse(list({employee_id for employee_id, _month in keys})).exists()
+        }
+        if profile_index is None:
+            profile_index = CostProfile._get_validity_index(list(employees))
+        locked_keys = self._get_locked_keys(keys, employees)
+        existing = self._get_allocation_map(keys)
+
+        new_vals = []
+        stale = self.browse()
+        for employee_id, month in keys:
+            employee = employees.get(employee_id)
+            if not employee or (employee_id, month) in locked_keys:
+                continue
+            working_days = employee.get_working_days_for_month(month.month, month.year)
+            month_end = date_utils.end_of(month, 'month')
+            dates, _profiles = profile_index.get(employee_id, ((), ()))
+            starts = [month] + [date_from for date_from in dates if month < date_from <= month_end]
+            ends = [start - timedelta(days=1) for start in starts[1:]] + [month_end]
+            current = {allocation.date_from: allocation for allocation in existing.get((employee_id, month), ())}
+            for date_from, date_to in zip(starts, ends):
+                costs = CostProfile._get_costs_at(profile_index, employee, date_from)
+                vals = {fname: costs[fname] / (working_days or 1) for fname in ALLOCATION_FIELDS}
+                vals.update(working_days=working_days, date_to=date_to)
+                allocation = current.pop(date_from, None)
+                if not allocation:
+                    new_vals.append(dict(vals, employee_id=employee_id, month=month, date_from=date_from))
+                elif any(allocation[fname] != value for fname, value in vals.items()):
+                    allocation.sudo().write(vals)
+            # segments of profiles no longer in effect during the month
+            stale = stale.concat(*current.values())
+        stale.sudo().unlink()
+        self.sudo().create(new_vals)
+        self.env['hr.attendance'].invalidate_model(ALLOCATION_FIELDS + ['total_expense'])
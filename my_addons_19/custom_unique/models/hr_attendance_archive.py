@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+import csv
+import gzip
+import io
+import logging
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import api, fields, models
+from odoo.tools import date_utils, str2bool
+
+from .hr_attendance_allocation import ALLOCATION_FIELDS
+
+_logger = logging.getLogger(__name__)
+
+ARCHIVE_HORIZON_PARAM = 'custom_unique.attendance_archive_months'
+ARCHIVE_EXPORT_PARAM = 'custom_unique.attendance_archive_export'
+ARCHIVE_BATCH_EMPLOYEES = 200
+
+# hr.attendance groupby -> archive field, the key of an archive row
+ARCHIVE_GROUPBY = {
+    'employee_id': 'employee_id',
+    'project_id': 'project_id',
+    'attendance_date:day': 'attendance_date',
+    'attendance_day': 'attendance_day',
+    'company_id': 'company_id',
+    'company_code': 'company_code',
+    'employee_code': 'employee_code',
+    'sector': 'sector',
+    'designation_id': 'designation_id',
+    'emp_working_dept': 'emp_working_dept',
+    'employee_department': 'employee_department',
+    'project_ref': 'project_ref',
+    'vessel_name': 'vessel_name',
+    'client_id': 'client_id',
+    'enquiry_department_code': 'enquiry_department_code',
+    'currency_id': 'currency_id',
+}
+ARCHIVE_AGGREGATES = [
+    ('normal_hour', 'max'), ('worked_hours', 'sum'), ('overtime_hours', 'sum'),
+    ('weekday_overtime_hours', 'sum'), ('weekend_overtime_hours', 'sum'),
+    ('rate_per_hour', 'avg'), ('salary_rate_per_hour', 'avg'),
+    ('total_hours_amount', 'sum'), ('st_salary_total_hour', 'sum'), ('misc_amount', 'sum'),
+]
+
+
+class HrAttendanceArchive(models.Model):
+    """
+    Attendances of closed months older than the archive horizon, aggregated
+    per employee, project and day with their reporting dimensions. The
+    scheduled action moves them here and deletes the raw rows, with their
+    tracking history.
+    """
+    _name = 'hr.attendance.archive'
+    _description = 'Archived Attendance'
+    _order = 'attendance_date desc, employee_id'
+
+    employee_id = fields.Many2one('hr.employee', string="Employee", index=True, readonly=True)
+    project_id = fields.Many2one('project.project', string="Project", index=True, readonly=True)
+    attendance_date = fields.Date(string="Attendance Date", index=True, readonly=True)
+    attendance_day = fields.Char(string="Day", readonly=True)
+    attendance_count = fields.Integer(string="Attendances", readonly=True)
+    company_id = fields.Many2one('res.company', string="Company", index=True, readonly=True)
+    company_code = fields.Char(string="Company Code", readonly=True)
+    employee_code = fields.Char(string="Employee Code", readonly=True)
+    sector = fields.Selection([
+        ('marine', 'Marine'),
+        ('process', 'Process'),
+        ('construction', 'Construction'),
+        ('employment_agency', 'Employment Agency'),
+    ], string='Sector', readonly=True)
+    designation_id = fields.Many2one('hr.job', string="Designation", readonly=True)
+    emp_working_dept = fields.Many2one('hr.department', string="Employee Working Department", readonly=True)
+    employee_department = fields.Char(string="Department", readonly=True)
+    project_ref = fields.Char(string="Project No.", readonly=True)
+    vessel_name = fields.Char(string="Vessel Name", readonly=True)
+    client_id = fields.Many2one('res.partner', string="Client", readonly=True)
+    enquiry_department_code = fields.Char(string="Project Department", readonly=True)
+    currency_id = fields.Many2one('res.currency', string="Currency", readonly=True)
+    normal_hour = fields.Float(string="Normal Hour", readonly=True)
+    worked_hours = fields.Float(string="Worked Hours", readonly=True)
+    overtime_hours = fields.Float(string="Overtime Hours", readonly=True)
+    weekday_overtime_hours = fields.Float(string="WeekDay Overtime Hours", readonly=True)
+    weekend_overtime_hours = fields.Float(string="Weekend Overtime Hours", readonly=True)
+    rate_per_hour = fields.Monetary(string="Rate Per Hour", readonly=True)
+    salary_rate_per_hour = fields.Monetary(string="Salary Rate Per Hour", readonly=True)
+    total_hours_amount = fields.Monetary(string="Total (Hours × Rate)", readonly=True)
+    st_salary_total_hour = fields.Monetary(string="ST Total", readonly=True)
+    cpf_amount = fields.Monetary(string="CPF", readonly=True)
+    levy_amount = fields.Monetary(string="Levy", readonly=True)
+    accomodation_amount = fields.Monetary(string="Accommodation", readonly=True)
+    transportation_amount = fields.Monetary(string="Transportation", readonly=True)
+    insurance_amount = fields.Monetary(string="Insurance", readonly=True)
+    admin_cost_amount = fields.Monetary(string="Admin Cost", readonly=True)
+    certification_audit_cost_amount = fields.Monetary(string="Certification / Audit Cost", readonly=True)
+    office_rent_amount = fields.Monetary(string="Office Rent", readonly=True)
+    oh_cost_amount = fields.Monetary(string="OH Cost", readonly=True)
+    others_cost_amount = fields.Monetary(string="Others", readonly=True)
+    misc_amount = fields.Monetary(string="Misc", readonly=True)
+    total_expense = fields.Monetary(string="Total Expense", readonly=True)
+    export_attachment_id = fields.Many2one('ir.attachment', string="Raw Rows Export", readonly=True)
+
+    @api.model
+    def _get_archive_cutoff(self):
+        """First day of the oldest month kept in hr.attendance, None when archiving is disabled"""
+        horizon = int(self.env['ir.config_parameter'].sudo().get_param(ARCHIVE_HORIZON_PARAM, 0) or 0)
+        if horizon <= 0:
+            return None
+        return date_utils.start_of(fields.Date.context_today(self) - relativedelta(months=horizon), 'month')
+
+    @api.model
+    def _archive_attendances(self):
+        """
+        Cron: archive the months closed by an attendance period before the
+        horizon, ARCHIVE_BATCH_EMPLOYEES employees at a time, committing after
+        each batch. Open months are kept: their attendances can still change.
+        """
+        cutoff = self._get_archive_cutoff()
+        if not cutoff:
+            return
+        Attendance = self.env['hr.attendance'].sudo()
+        periods = self.env['hr.attendance.period'].sudo().search(
+            [('state', '=', 'closed'), ('date_from', '<', cutoff)], order='date_from')
+        batches = []
+        for period in periods:
+            domain = period._get_attendance_domain()
+            employee_ids = [employee.id for [employee] in Attendance._read_group(domain, ['employee_id'])]
+            batches += [
+                (period, domain, employee_ids[i:i + ARCHIVE_BATCH_EMPLOYEES])
+                for i in range(0, len(employee_ids), ARCHIVE_BATCH_EMPLOYEES)
+            ]
+
+        IrCron = self.env['ir.cron']
+        IrCron._commit_progress(remaining=len(batches))
+        export = str2bool(self.env['ir.config_parameter'].sudo().get_param(ARCHIVE_EXPORT_PARAM, 'False'))
+        for period, domain, employee_ids in batches:
+            attendances = Attendance.search(domain + [('employee_id', 'in', employee_ids)])
+            archives = self._create_from_attendances(attendances)
+            if export and archives:
+                archives.export_attachment_id = self._export_attendances(attendances, period.date_from, archives[0])
+            _logger.info("Archived %s attendances of %s into %s rows", len(attendances), period.name, len(archives))
+            attendances.with_context(attendance_archive=True).unlink()
+            if not IrCron._commit_progress(1):
+                break
+
+    @api.model
+    def _create_from_attendances(self, attendances):
+        groups = self.env['hr.attendance'].sudo()._read_group(
+            [('id', 'in', attendances.ids)],
+            list(ARCHIVE_GROUPBY),
+            ['__count'] + ['%s:%s' % (fname, aggregate) for fname, aggregate in ARCHIVE_AGGREGATES],
+        )
+        archive_fnames = list(ARCHIVE_GROUPBY.values()) + ['attendance_count'] + [
+            fname for fname, _aggregate in ARCHIVE_AGGREGATES
+        ]
+        vals_list = [
+            {
+                fname: value.id if isinstance(value, models.BaseModel) else value
+                for fname, value in zip(archive_fnames, group)
+            }
+            for group in groups
+        ]
+        # overheads are one per-day allocation of the day per attendance
+        Allocation = self.env['hr.attendance.allocation']
+        allocations = Allocation._get_allocation_map({
+            (vals['employee_id'], vals['attendance_date'].replace(day=1))
+            for vals in vals_list if vals['employee_id'] and vals['attendance_date']
+        })
+        for vals in vals_list:
+            allocation = vals['attendance_date'] and Allocation._get_allocation_at(
+                allocations, vals['employee_id'], vals['attendance_date'])
+            count = vals['attendance_count']
+            for fname in ALLOCATION_FIELDS:
+                vals[fname] = count * allocation[fname] if allocation else 0.0
+            vals['total_expense'] = ((vals['st_salary_total_hour'] or 0.0) + (vals['misc_amount'] or 0.0)
+                                     + (count * allocation.total_amount if allocation else 0.0))
+        return self.sudo().create(vals_list)
+
+    @api.model
+    def _export_attendances(self, attendances, month_start, archive):
+        """Gzipped CSV of the raw attendance rows, attached to ``archive`` so it shares its access rights"""
+        fnames = [
+            fname for fname, field in attendances._fields.items()
+            if field.store and field.type not in ('one2many', 'many2many', 'binary')
+        ]
+        buffer = io.BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode='wb') as gz_file:
+            text = io.TextIOWrapper(gz_file, encoding='utf-8', newline='')
+            writer = csv.writer(text)
+            writer.writerow(fnames)
+            for row in attendances.read(fnames, load=None):
+                writer.writerow([row[fname] for fname in fnames])
+            text.flush()
+            text.detach()
+        return self.env['ir.attachment'].sudo().create({
+            'name': 'hr_attendance_%s_%s.csv.gz' % (month_start.strftime('%Y-%m'), archive.id),
+            'raw': buffer.getvalue(),
+            'mimetype': 'application/gzip',
+            'res_model': self._name,
+            'res_id': archive.id,
+        })
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from odoo import api, fields, models, tools, _
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import date_utils
+
+from .hr_attendance_allocation import ALLOCATION_FIELDS
+
+# fields written when a period is closed or reopened, everything else is locked on closed periods
+PERIOD_STATE_FIELDS = {'state', 'closed_by_id', 'closed_date'}
+SUMMARY_AGGREGATES = [
+    'worked_hours', 'overtime_hours', 'weekday_overtime_hours', 'weekend_overtime_hours',
+    'total_hours_amount', 'st_salary_total_hour',
+]
+
+
+class HrAttendancePeriod(models.Model):
+    """
+    Attendance month of a company. Closing it snapshots the per employee and
+    project totals in hr.attendance.summary and locks the month: its
+    attendances can no longer be edited and the costing engine skips them.
+    """
+    _name = 'hr.attendance.period'
+    _description = 'Attendance Period'
+    _order = 'date_from desc, company_id'
+
+    name = fields.Char(string="Period", compute='_compute_name', store=True)
+    company_id = fields.Many2one('res.company', string="Company", required=True, default=lambda self: self.env.company)
+    date_from = fields.Date(string="Month", required=True,
+                            default=lambda self: date_utils.start_of(fields.Date.context_today(self), 'month'))
+    date_to = fields.Date(string="Last Day", compute='_compute_date_to', store=True)
+    state = fields.Selection([('open', 'Open'), ('closed', 'Closed')], string="Status", default='open',
+                             required=True, readonly=True)
+    closed_by_id = fields.Many2one('res.users', string="Closed By", readonly=True)
+    closed_date = fields.Datetime(string="Closed On", readonly=True)
+    summary_ids = fields.One2many('hr.attendance.summary', 'period_id', string="Summaries", readonly=True)
+
+    _company_month_unique = models.Constraint(
+        'UNIQUE(company_id, date_from)',
+        'This month already exists for the company.',
+    )
+
+    @api.depends('date_from')
+    def _compute_name(self):
+        for period in self:
+            period.name = period.date_from and period.date_from.strftime('%B %Y')
+
+    @api.depends('date_from')
+    def _compute_date_to(self):
+        for period in self:
+            period.date_to = period.date_from and date_utils.end_of(period.date_from, 'month')
+
+    @api.constrains('date_from')
+    def _check_date_from(self):
+        if any(period.date_from.day != 1 for period in self):
+            raise ValidationError(_("An attendance period starts on the first day of a month."))
+
+    @api.model
+    @tools.ormcache()
+    def _get_locked_months(self):
+        """frozenset of the (company id, first day of month) of the closed periods"""
+        return frozenset(
+            (period.company_id.id, period.date_from)
+            for period in self.sudo().search([('state', '=', 'closed')])
+        )
+
+    def _get_attendance_domain(self):
+        self.ensure_one()
+        # same lock key as hr.attendance._get_locked_attendances
+        return [
+            '|', ('company_id', '=', self.company_id.id),
+            '&', ('company_id', '=', False), ('employee_id.company_id', '=', self.company_id.id),
+            ('attendance_date', '>=', self.date_from),
+            ('attendance_date', '<=', self.date_to),
+        ]
+
+    def action_close(self):
+        Attendance = self.env['hr.attendance']
+        Allocation = self.env['hr.attendance.allocation']
+        Summary = self.env['hr.attendance.summary']
+        for period in self.filtered(lambda p: p.state == 'open'):
+            domain = period._get_attendance_domain()
+            if Attendance.search_count(domain + [('check_out', '=', False)], limit=1):
+                raise UserError(_("%s still has attendances in progress. Check them out before closing the month.")
+                                % period.name)
+            # per day: overheads are one per-day allocation of the day per attendance
+            groups = Attendance._read_group(
+                domain, ['employee_id', 'project_id', 'attendance_date:day'],
+                ['__count', 'misc_amount:sum'] + ['%s:sum' % fname for fname in SUMMARY_AGGREGATES],
+            )
+            allocations = Allocation._get_allocation_map(
+                {(employee.id, period.date_from) for employee, *_values in groups})
+            summaries = {}
+            for employee, project, day, count, misc_amount, *totals in groups:
+                vals = summaries.get((employee.id, project.id))
+                if vals is None:
+                    vals = summaries[(employee.id, project.id)] = dict(
+                        dict.fromkeys(SUMMARY_AGGREGATES + ALLOCATION_FIELDS + ['misc_amount'], 0.0),
+                        period_id=period.id, employee_id=employee.id, project_id=project.id, attendance_count=0)
+                allocation = Allocation._get_allocation_at(allocations, employee.id, day)
+                vals['attendance_count'] += count
+                vals['misc_amount'] += misc_amount or 0.0
+                for fname, total in zip(SUMMARY_AGGREGATES, totals):
+                    vals[fname] += total or 0.0
+                for fname in ALLOCATION_FIELDS:
+                    vals[fname] += count * allocation[fname] if allocation else 0.0
+            for vals in summaries.values():
+                vals['total_expense'] = (vals['st_salary_total_hour'] + vals['misc_amount']
+                                         + sum(vals[fname] for fname in ALLOCATION_FIELDS))
+            Summary.create(list(summaries.values()))
+        self.filtered(lambda p: p.state == 'open').write({
+            'state': 'closed',
+            'closed_by_id': self.env.uid,
+            'closed_date': fields.Datetime.now(),
+        })
+        return True
+
+    def action_reopen(self):
+        """Drop the snapshots and re-cost the month with the current cost profiles"""
+        closed = self.filtered(lambda p: p.state == 'closed')
+        Archive = self.env['hr.attendance.archive'].sudo()
+        for period in closed:
+            # the archived attendances are gone, closing the month again could not count them
+            if Archive.search_count(period._get_attendance_domain(), limit=1):
+                raise UserError(_("%s has been archived and cannot be reopened.") % period.name)
+        closed.summary_ids.sudo().with_context(unlink_attendance_summary=True).unlink()
+        closed.write({'state': 'open', 'closed_by_id': False, 'closed_date': False})
+        Attendance = self.env['hr.attendance']
+        for period in closed:
+            for employee in Attendance.search(period._get_attendance_domain()).employee_id:
+                Attendance._recalculate_month_attendances(employee.id, period.date_from.month, period.date_from.year)
+        return True
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        periods = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return periods
+
+    def write(self, vals):
+        if set(vals) - PERIOD_STATE_FIELDS and self.filtered(lambda p: p.state == 'closed'):
+            raise UserError(_("A closed attendance period cannot be modified, reopen it first."))
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        if self.filtered(lambda p: p.state == 'closed'):
+            raise UserError(_("A closed attendance period cannot be deleted, reopen it first."))
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+
+class HrAttendanceSummary(models.Model):
+    """Immutable monthly totals of an employee on a project, written when the period is closed"""
+    _name = 'hr.attendance.summary'
+    _description = 'Attendance Period Summary'
+    _order = 'date desc, employee_id, project_id'
+
+    period_id = fields.Many2one('hr.attendance.period', string="Period", required=True, index=True,
+                                ondelete='restrict', readonly=True)
+    company_id = fields.Many2one(related='period_id.company_id', store=True)
+    date = fields.Date(related='period_id.date_from', string="Month", store=True)
+    currency_id = fields.Many2one(related='company_id.currency_id')
+    employee_id = fields.Many2one('hr.employee', string="Employee", index=True, readonly=True)
+    project_id = fields.Many2one('project.project', string="Project", index=True, readonly=True)
+    attendance_count = fields.Integer(string="Attendances", readonly=True)
+    worked_hours = fields.Float(string="Worked Hours", readonly=True)
+    overtime_hours = fields.Float(string="Overtime Hours", readonly=True)
+    weekday_overtime_hours = fields.Float(string="WeekDay Overtime Hours", readonly=True)
+    weekend_overtime_hours = fields.Float(string="Weekend Overtime Hours", readonly=True)
+    total_hours_amount = fields.Monetary(string="Total (Hours × Rate)", readonly=True)
+    st_salary_total_hour = fields.Monetary(string="ST Total", readonly=True)
+    cpf_amount = fields.Monetary(string="CPF", readonly=True)
+    levy_amount = fields.Monetary(string="Levy", readonly=True)
+    accomodation_amount = fields.Monetary(string="Accommodation", readonly=True)
+    transportation_amount = fields.Monetary(string="Transportation", readonly=True)
+    insurance_amount = fields.Monetary(string="Insurance", readonly=True)
+    admin_cost_amount = fields.Monetary(string="Admin Cost", readonly=True)
+    certification_audit_cost_amount = fields.Monetary(string="Certification / Audit Cost", readonly=True)
+    office_rent_amount = fields.Monetary(string="Office Rent", readonly=True)
+    oh_cost_amount = fields.Monetary(string="OH Cost", readonly=True)
+    others_cost_amount = fields.Monetary(string="Others", readonly=True)
+    misc_amount = fields.Monetary(string="Misc", readonly=True)
+    total_expense = fields.Monetary(string="Total Expense", readonly=True)
+
+    def write(self, vals):
+        raise UserError(_("Attendance period summaries cannot be modified."))
+
+    def unlink(self):
+        if not (self.env.su and self.env.context.get('unlink_attendance_summary')):
+            raise UserError(_("Attendance period summaries are removed by reopening their period."))
+        return super().unlink()
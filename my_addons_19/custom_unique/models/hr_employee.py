@@ -2,16 +2,28 @@
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
 from odoo import models, fields, api, exceptions, _
-from datetime import datetime
+from datetime import date, datetime
 from odoo.exceptions import ValidationError, UserError
+from odoo.fields import Domain
+from odoo.tools import date_utils
+from .hr_employee_cost_profile import COST_PROFILE_FIELDS
+from .hr_attendance_allocation import ALLOCATION_FIELDS
 import xlsxwriter
 import base64
 from io import BytesIO
 import pytz
 import logging
+import time
+from collections import OrderedDict
 
 _logger = logging.getLogger(__name__)
 
+HOURS_CACHE_SIZE = 4096
+HOURS_CACHE_TTL = 60
+# (dbname, employee id) -> (month start, expiry, hours, validated overtime), per worker;
+# only filled with the sums of committed transactions
+_HOURS_CACHE = OrderedDict()
+
 
 class HREmployee(models.Model):
     _inherit = 'hr.employee'
@@ -38,6 +50,7 @@ class HREmployee(models.Model):
     office_rent_amount = fields.Monetary(string="Office Rent", tracking=True)
     oh_cost_amount = fields.Monetary(string="OH Cost", tracking=True)
     others_cost_amount = fields.Monetary(string="Others", tracking=True)
+    cost_profile_ids = fields.One2many('hr.employee.cost.profile', 'employee_id', string="Cost History")
 
     # REMOVED: working_days_month field
 
@@ -46,32 +59,94 @@ class HREmployee(models.Model):
         for vals in vals_list:
             if not vals.get('code'):
                 vals['code'] = self.env['ir.sequence'].next_by_code('hr.employee') or _('New')
-        return super(HREmployee, self).create(vals_list)
+        employees = super(HREmployee, self).create(vals_list)
+        self.env['hr.employee.cost.profile'].sudo()._create_baselines(employees)
+        return employees
+
+    def write(self, vals):
+        # cost changes made on the employee take effect today, dated changes go through cost_profile_ids
+        if self.env.context.get('skip_cost_profile') or not set(COST_PROFILE_FIELDS).intersection(vals):
+            return super(HREmployee, self).write(vals)
+        CostProfile = self.env['hr.employee.cost.profile'].sudo()
+        CostProfile._create_baselines(self)
+        res = super(HREmployee, self).write(vals)
+        CostProfile._set_profiles(self, fields.Date.context_today(self))
+        return res
 
     def _compute_hours_last_month(self):
+        """
+        Hours and validated overtime since the start of the month in each
+        employee's timezone, summed for the whole recordset in one grouped
+        query. Results are kept per worker for each (employee, month) until an
+        attendance of the employee changes, or at most HOURS_CACHE_TTL seconds
+        for changes made by other workers. They are only cached once the
+        transaction commits, so uncommitted attendances never leak into it.
+        """
         now = fields.Datetime.now()
         now_utc = pytz.utc.localize(now)
+        dbname = self.env.cr.dbname
+        now_monotonic = time.monotonic()
+        month_starts = {}
+        results = {}
         for employee in self:
             tz = pytz.timezone(employee.tz or 'UTC')
             now_tz = now_utc.astimezone(tz)
             start_tz = now_tz.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
             start_naive = start_tz.astimezone(pytz.utc).replace(tzinfo=None)
-            end_tz = now_tz
-            end_naive = end_tz.astimezone(pytz.utc).replace(tzinfo=None)
+            employee_id = employee._origin.id
+            if not employee_id:
+                continue
+            cached = _HOURS_CACHE.get((dbname, employee_id))
+            if cached and cached[0] == start_naive and cached[1] > now_monotonic:
+                results[employee_id] = cached[2:]
+            else:
+                month_starts[employee_id] = start_naive
+
+        if month_starts:
+            self.env['hr.attendance'].flush_model(
+                ['employee_id', 'check_in', 'check_out', 'worked_hours', 'validated_overtime_hours'])
+            self.env.cr.execute("""
+                SELECT att.employee_id,
+                       COALESCE(SUM(att.worked_hours), 0),
+                       COALESCE(SUM(att.validated_overtime_hours), 0)
+                  FROM hr_attendance att
+                  JOIN unnest(%s::int[], %s::timestamp[]) AS bound(employee_id, month_start)
+                    ON bound.employee_id = att.employee_id
+                 WHERE att.check_in >= bound.month_start
+                   AND att.check_out IS NOT NULL
+                   AND att.check_out <= %s
+              GROUP BY att.employee_id
+            """, [list(month_starts), list(month_starts.values()), now])
+            sums = {employee_id: (hours, overtime) for employee_id, hours, overtime in self.env.cr.fetchall()}
+            for employee_id in month_starts:
+                results[employee_id] = sums.get(employee_id, (0.0, 0.0))
+
+            @self.env.cr.postcommit.add
+            def cache_hours():
+                expiry = now_monotonic + HOURS_CACHE_TTL
+                for employee_id, start_naive in month_starts.items():
+                    _HOURS_CACHE[(dbname, employee_id)] = (start_naive, expiry) + results[employee_id]
+                    _HOURS_CACHE.move_to_end((dbname, employee_id))
+                while len(_HOURS_CACHE) > HOURS_CACHE_SIZE:
+                    _HOURS_CACHE.popitem(last=False)
 
-            current_month_attendances = employee.attendance_ids.filtered(
-                lambda att: att.check_in >= start_naive and att.check_out and att.check_out <= end_naive
-            )
+        for employee in self:
+            hours, overtime_hours = results.get(employee._origin.id, (0.0, 0.0))
+            employee.hours_last_month = round(hours, 2)
+            employee.hours_last_month_overtime = round(overtime_hours, 2)
 
-            hours = 0
-            overtime_hours = 0
+    @api.model
+    def _invalidate_hours_cache(self, employee_ids):
+        dbname = self.env.cr.dbname
+        employee_ids = list(employee_ids)
 
-            for att in current_month_attendances:
-                hours += att.worked_hours or 0
-                overtime_hours += att.validated_overtime_hours or 0
+        # again after commit: sums cached meanwhile predate the change
+        @self.env.cr.postcommit.add
+        def invalidate():
+            for employee_id in employee_ids:
+                _HOURS_CACHE.pop((dbname, employee_id), None)
 
-            employee.hours_last_month = round(hours, 2)
-            employee.hours_last_month_overtime = round(overtime_hours, 2)
+        invalidate()
 
     def action_open_working_days(self):
         return {
@@ -92,77 +167,84 @@ class HREmployee(models.Model):
         """
         Get unique working days count for employee in specific month/year
         """
-        attendances = self.env['hr.attendance'].search([
+        month_start = date(year, month, 1)
+        month_domain = [
             ('employee_id', '=', self.id),
-            ('attendance_date', '!=', False)
-        ])
-
+            ('attendance_date', '>=', month_start),
+            ('attendance_date', '<=', date_utils.end_of(month_start, 'month')),
+        ]
         working_dates = set()
-        for att in attendances:
-            att_date = att.attendance_date
-            if att_date.month == month and att_date.year == year:
-                working_dates.add(att_date)
+        # archived attendances keep one row per employee, project and day
+        for model_name in ('hr.attendance', 'hr.attendance.archive'):
+            working_dates.update(
+                att_date for [att_date] in self.env[model_name]._read_group(month_domain, ['attendance_date:day'])
+            )
 
         return len(working_dates)
 
 
 class HrAttendance(models.Model):
-    _inherit = 'hr.attendance'
+    _name = 'hr.attendance'
+    _inherit = ['hr.attendance', 'attendance.time.formatter']
     _order = "attendance_date asc"
 
     project_id = fields.Many2one('project.project', string="Project", tracking=True)
-    project_ref = fields.Char(string="Project No.", readonly=True, related="project_id.project_ref")
+    project_ref = fields.Char(string="Project No.", compute='_compute_dimensions', store=True, index=True)
     attendance_date = fields.Date(string="Attendance Date", tracking=True)
     attendance_day = fields.Char(string="Day", compute='_compute_attendance_day', store=True)
     client_id = fields.Many2one('res.partner', string='Client',
                                 domain="[('parent_id', '=', False), ('approved_by_boss', '=', True)]",
-                                related="project_id.client_id", tracking=True)
+                                compute='_compute_dimensions', store=True, index=True)
     enquiry_department_id = fields.Many2one("enquiry.department", string="Project Department", tracking=True)
     enquiry_department_code = fields.Char(related="enquiry_department_id.code", store=True)
-    vessel_name = fields.Char(string="Vessel Name", related="project_id.name")
+    vessel_name = fields.Char(string="Vessel Name", compute='_compute_dimensions', store=True, index=True)
     worked_hours = fields.Float(string="Worked Hours", compute="_compute_worked_hours", store=True, tracking=True)
     overtime_hours = fields.Float(string="Overtime Hours", compute="_compute_overtime_hours", store=True, tracking=True)
     weekend_overtime_hours = fields.Float(string="Weekend Overtime Hours", compute="_compute_overtime_hours",
                                           store=True, tracking=True)
     weekday_overtime_hours = fields.Float(string="WeekDay Overtime Hours", compute="_compute_overtime_hours",
                                           store=True, tracking=True)
-    rate_per_hour = fields.Monetary(string="Rate Per Hour", related="employee_id.rate_per_hour", store=True,
-                                    tracking=True)
-    salary_rate_per_hour = fields.Monetary(string="Salary Rate Per Hour", related="employee_id.salary_rate_per_hour",
-                                           store=True, tracking=True)
+    # set by _calculate_attendance_costs from the cost profile in effect on attendance_date
+    rate_per_hour = fields.Monetary(string="Rate Per Hour", readonly=True, tracking=True)
+    salary_rate_per_hour = fields.Monetary(string="Salary Rate Per Hour", readonly=True, tracking=True)
 
     currency_id = fields.Many2one('res.currency', string="Currency", required=True,
                                   default=lambda self: self.env.company.currency_id.id, tracking=True)
 
-    # CPF and other expense fields - with tracking
-    cpf_amount = fields.Monetary(string="CPF")
-    levy_amount = fields.Monetary(string="Levy")
-    accomodation_amount = fields.Monetary(string="Accommodation")
-    transportation_amount = fields.Monetary(string="Transportation")
-    insurance_amount = fields.Monetary(string="Insurance")
-    admin_cost_amount = fields.Monetary(string="Admin Cost")
-    certification_audit_cost_amount = fields.Monetary(string="Certification / Audit Cost")
-    office_rent_amount = fields.Monetary(string="Office Rent")
-    oh_cost_amount = fields.Monetary(string="OH Cost")
-    others_cost_amount = fields.Monetary(string="Others")
-
+    # CPF and other expense fields: per-day share of the hr.attendance.allocation of the attendance date
+    cpf_amount = fields.Monetary(string="CPF", compute='_compute_overhead_allocation')
+    levy_amount = fields.Monetary(string="Levy", compute='_compute_overhead_allocation')
+    accomodation_amount = fields.Monetary(string="Accommodation", compute='_compute_overhead_allocation')
+    transportation_amount = fields.Monetary(string="Transportation", compute='_compute_overhead_allocation')
+    insurance_amount = fields.Monetary(string="Insurance", compute='_compute_overhead_allocation')
+    admin_cost_amount = fields.Monetary(string="Admin Cost", compute='_compute_overhead_allocation')
+    certification_audit_cost_amount = fields.Monetary(string="Certification / Audit Cost",
+                                                      compute='_compute_overhead_allocation')
+    office_rent_amount = fields.Monetary(string="Office Rent", compute='_compute_overhead_allocation')
+    oh_cost_amount = fields.Monetary(string="OH Cost", compute='_compute_overhead_allocation')
+    others_cost_amount = fields.Monetary(string="Others", compute='_compute_overhead_allocation')
+
+    # Stored copies of the employee/project dimensions used to filter and group attendances.
+    # They only depend on employee_id/project_id here; changes on the source records are
+    # propagated in batch by dimension.propagation.queue.
     emp_working_dept = fields.Many2one('hr.department', string='Employee Working Department',
-                                       related="employee_id.department_id",)
-    employee_department = fields.Char(string='Department', related="emp_working_dept.name")
-    designation_id = fields.Many2one('hr.job', related="employee_id.job_id", string="Designation", tracking=True)
+                                       compute='_compute_dimensions', store=True, index=True)
+    employee_department = fields.Char(string='Department', compute='_compute_dimensions', store=True, index=True)
+    designation_id = fields.Many2one('hr.job', string="Designation", compute='_compute_dimensions', store=True,
+                                     index=True)
     sector = fields.Selection([
         ('marine', 'Marine'),
         ('process', 'Process'),
         ('construction', 'Construction'),
         ('employment_agency', 'Employment Agency'),
-    ], string='Sector', related='employee_id.sector', tracking=True)
-    employee_code = fields.Char(string='Employee Code', related="employee_id.code")
+    ], string='Sector', compute='_compute_dimensions', store=True, index=True)
+    employee_code = fields.Char(string='Employee Code', compute='_compute_dimensions', store=True, index=True)
     work_location_id = fields.Many2one(related='employee_id.work_location_id', string='Location', related_sudo=False,
                                        tracking=True)
-    company_id = fields.Many2one('res.company', string='Company', index=True, related='employee_id.company_id',
-                                 tracking=True)
-    company_code = fields.Char(related="company_id.code")
-    total_expense = fields.Monetary(string="Total Expense", tracking=True)
+    company_id = fields.Many2one('res.company', string='Company', index=True, compute='_compute_dimensions',
+                                 store=True)
+    company_code = fields.Char(string="Company Code", compute='_compute_dimensions', store=True, index=True)
+    total_expense = fields.Monetary(string="Total Expense", compute='_compute_overhead_allocation')
     resource_calendar_id = fields.Many2one(related='employee_id.resource_calendar_id', store=True, check_company=True,
                                            tracking=True)
     normal_hour = fields.Float(string="Normal Hour", compute="_compute_normal_hour", store=True, tracking=True)
@@ -172,31 +254,23 @@ class HrAttendance(models.Model):
     check_in = fields.Datetime(string="Check In", required=True, tracking=True, index=True)
     check_out = fields.Datetime(string="Check Out", tracking=True)
 
-    def convert_utc_to_local_time_only(self, dt, tz_name='Asia/Kolkata'):
-        """
-        Convert UTC datetime → Any timezone → return only HH:MM string.
-
-        Default timezone: Asia/Kolkata
-        Example usage: 'Asia/Singapore'
-        """
-        if not dt:
-            return False
-
-        # If datetime is naive, make it UTC aware
-        if not dt.tzinfo:
-            dt = pytz.UTC.localize(dt)
-
-        # Convert to target timezone
-        try:
-            local_tz = pytz.timezone(tz_name)
-        except Exception:
-            local_tz = pytz.timezone('Asia/Kolkata')  # fallback
-
-        dt_local = dt.astimezone(local_tz)
-        return dt_local.strftime('%H:%M')
-
     _auto_update_flag = False  # Temporary flag
 
+    @api.depends('employee_id', 'project_id')
+    def _compute_dimensions(self):
+        for rec in self:
+            employee, project = rec.employee_id, rec.project_id
+            rec.employee_code = employee.code
+            rec.sector = employee.sector
+            rec.designation_id = employee.job_id
+            rec.emp_working_dept = employee.department_id
+            rec.employee_department = employee.department_id.name
+            rec.company_id = employee.company_id
+            rec.company_code = employee.company_id.code
+            rec.project_ref = project.project_ref
+            rec.vessel_name = project.name
+            rec.client_id = project.client_id
+
     @api.onchange('attendance_date')
     def _onchange_attendance_date(self):
         if not self.attendance_date:
@@ -299,31 +373,30 @@ class HrAttendance(models.Model):
     #         return {'warning': warning}
 
 
-    def _calculate_attendance_costs(self):
+    def _calculate_attendance_costs(self, profile_index=None):
         """
-        Calculate all costs for this attendance record based on working days
+        Calculate the hour-based costs of this attendance record with the
+        employee cost profile in effect on the attendance date
+        (``profile_index`` from hr.employee.cost.profile._get_validity_index).
+        The overhead amounts are read from hr.attendance.allocation.
         Uses direct write to avoid triggering write() method recursion
         """
         if not self.employee_id or not self.attendance_date:
             return
 
         employee = self.employee_id
-        month = self.attendance_date.month
-        year = self.attendance_date.year
-        misc_amount = self.misc_amount
-
-        # Get working days for this employee in this month
-        total_working_days = employee.get_working_days_for_month(month, year)
 
-        if total_working_days == 0:
-            total_working_days = 1  # Avoid division by zero
+        CostProfile = self.env['hr.employee.cost.profile']
+        if profile_index is None:
+            profile_index = CostProfile._get_validity_index(employee.ids)
+        costs = CostProfile._get_costs_at(profile_index, employee, self.attendance_date)
 
         # Calculate hour-based amounts
         worked_hours = self.worked_hours or 0.0
         weekday_ot = self.weekday_overtime_hours or 0.0
         weekend_ot = self.weekend_overtime_hours or 0.0
-        rate = self.rate_per_hour or 0.0
-        salary_rate = self.salary_rate_per_hour or 0.0
+        rate = costs['rate_per_hour']
+        salary_rate = costs['salary_rate_per_hour']
 
         normal_hours = worked_hours - weekday_ot - weekend_ot
         if normal_hours < 0:
@@ -341,64 +414,84 @@ class HrAttendance(models.Model):
         if self.project_id and self.project_id.department_id:
             enquiry_department_id = self.project_id.department_id.id
 
-        # Calculate per-day expense amounts
-        cpf_amount = (employee.cpf_amount or 0.0) / total_working_days
-        levy_amount = (employee.levy_amount or 0.0) / total_working_days
-        accomodation_amount = (employee.accomodation_amount or 0.0) / total_working_days
-        transportation_amount = (employee.transportation_amount or 0.0) / total_working_days
-        insurance_amount = (employee.insurance_amount or 0.0) / total_working_days
-        admin_cost_amount = (employee.admin_cost_amount or 0.0) / total_working_days
-        certification_audit_cost_amount = (employee.certification_audit_cost_amount or 0.0) / total_working_days
-        office_rent_amount = (employee.office_rent_amount or 0.0) / total_working_days
-        oh_cost_amount = (employee.oh_cost_amount or 0.0) / total_working_days
-        others_cost_amount = (employee.others_cost_amount or 0.0) / total_working_days
-
-        # Calculate total expense
-        total_expense = sum([
-            cpf_amount, levy_amount, accomodation_amount,
-            transportation_amount, insurance_amount, admin_cost_amount,
-            certification_audit_cost_amount, office_rent_amount,
-            oh_cost_amount, others_cost_amount, st_salary_total_hour, misc_amount
-        ])
-
         # CRITICAL: Use with_context to prevent recursion
         # This bypasses the write() override and prevents recalculation loop
-        self.with_context(skip_recalculation=True).write({
+        # System recompute: no tracking values for the derived costs
+        self.with_context(skip_recalculation=True, mail_notrack=True).write({
+            'rate_per_hour': rate,
+            'salary_rate_per_hour': salary_rate,
             'total_hours_amount': total_hours_amount,
             'st_salary_total_hour': st_salary_total_hour,
             'enquiry_department_id': enquiry_department_id,
-            'cpf_amount': cpf_amount,
-            'levy_amount': levy_amount,
-            'accomodation_amount': accomodation_amount,
-            'transportation_amount': transportation_amount,
-            'insurance_amount': insurance_amount,
-            'admin_cost_amount': admin_cost_amount,
-            'certification_audit_cost_amount': certification_audit_cost_amount,
-            'office_rent_amount': office_rent_amount,
-            'oh_cost_amount': oh_cost_amount,
-            'others_cost_amount': others_cost_amount,
-            'misc_amount': misc_amount,
-            'total_expense': total_expense,
         })
 
     def _recalculate_month_attendances(self, employee_id, month, year):
         """
-        Recalculate all attendance costs for a specific employee-month
-        This is called when working days change
+        Refresh the overhead allocation of a specific employee-month and
+        recalculate the hour-based costs of its attendances
         """
+        month_start = date(year, month, 1)
         attendances = self.search([
             ('employee_id', '=', employee_id),
-            ('attendance_date', '!=', False)
+            ('attendance_date', '>=', month_start),
+            ('attendance_date', '<=', date_utils.end_of(month_start, 'month')),
         ])
 
-        # Filter for specific month/year
-        month_attendances = attendances.filtered(
-            lambda a: a.attendance_date.month == month and a.attendance_date.year == year
-        )
+        # Closed months keep the costs of their snapshot
+        attendances -= attendances._get_locked_attendances()
 
-        # Recalculate each attendance
-        for att in month_attendances:
-            att._calculate_attendance_costs()
+        profile_index = self.env['hr.employee.cost.profile']._get_validity_index([employee_id])
+        self.env['hr.attendance.allocation']._refresh_allocations({(employee_id, month_start)}, profile_index)
+        for att in attendances:
+            att._calculate_attendance_costs(profile_index)
+
+    def _refresh_month_costs(self, months_to_recalculate):
+        """
+        Refresh the overhead allocations of the (employee id, month, year)
+        ``months_to_recalculate`` and cost the attendances of ``self``: the
+        other attendances of these months keep their hour-based costs.
+        """
+        self.env['hr.attendance.allocation']._refresh_allocations(
+            {(emp_id, date(year, month, 1)) for emp_id, month, year in months_to_recalculate})
+        attendances = self.exists().filtered(lambda att: att.check_out)
+        attendances -= attendances._get_locked_attendances()
+        if not attendances:
+            return
+        profile_index = self.env['hr.employee.cost.profile']._get_validity_index(attendances.employee_id.ids)
+        for att in attendances:
+            att._calculate_attendance_costs(profile_index)
+
+    def _get_locked_attendances(self):
+        """Attendances of the months closed by an hr.attendance.period"""
+        locked_months = self.env['hr.attendance.period']._get_locked_months()
+        if not locked_months:
+            return self.browse()
+        return self.filtered(lambda att: att.attendance_date and (
+            (att.company_id or att.employee_id.company_id).id, att.attendance_date.replace(day=1)) in locked_months)
+
+    def _check_period_open(self):
+        locked = self._get_locked_attendances()
+        if locked:
+            raise UserError(_(
+                "The attendances of %s are in a closed period and cannot be changed."
+            ) % ", ".join(sorted({att.attendance_date.strftime('%B %Y') for att in locked})))
+
+    @api.model
+    def _recost_from(self, start_by_employee, profile_index=None):
+        """Re-cost the attendances of each employee id from its start date on"""
+        if not start_by_employee:
+            return
+        attendances = self.search(Domain.OR(
+            Domain('employee_id', '=', employee_id) & Domain('attendance_date', '>=', date_from)
+            for employee_id, date_from in start_by_employee.items()
+        ))
+        attendances -= attendances._get_locked_attendances()
+        if profile_index is None:
+            profile_index = self.env['hr.employee.cost.profile']._get_validity_index(list(start_by_employee))
+        self.env['hr.attendance.allocation']._refresh_allocations(
+            {(att.employee_id.id, att.attendance_date.replace(day=1)) for att in attendances}, profile_index)
+        for att in attendances:
+            att._calculate_attendance_costs(profile_index)
 
     @api.model
     def create(self, vals_list):
@@ -411,21 +504,34 @@ class HrAttendance(models.Model):
                 vals_copy['check_in'] = self._remove_seconds(vals_copy['check_in'])
             if vals_copy.get('check_out'):
                 vals_copy['check_out'] = self._remove_seconds(vals_copy['check_out'])
+            elif vals_copy.get('check_in') and vals_copy.get('employee_id') and not vals_copy.get('attendance_date'):
+                # open attendance (kiosk check-in): dated like its check-in in the employee's timezone
+                employee = self.env['hr.employee'].browse(vals_copy['employee_id'])
+                check_in = pytz.utc.localize(fields.Datetime.to_datetime(vals_copy['check_in']))
+                vals_copy['attendance_date'] = check_in.astimezone(self._get_local_tz(employee)).date()
             cleaned_vals_list.append(vals_copy)
 
         # Create records
         records = super(HrAttendance, self).create(cleaned_vals_list)
+        records._check_period_open()
+
+        # Open attendances only record the check-in: their rollups and costing
+        # run when the check-out is written
+        closed_records = records.filtered('check_out')
+        self.env['hr.employee']._invalidate_hours_cache(closed_records.employee_id.ids)
 
-        # Process each created record
+        # Process each created record, once per combination for batches
         months_to_recalculate = set()
+        affected_combinations = set()
+        affected_estimation_dates = set()
 
-        for attendance in records:
+        for attendance in closed_records:
             # Update project relations
             if attendance.employee_id and attendance.project_id:
-                self._update_project_employee_hours(attendance.employee_id, attendance.project_id)
+                affected_combinations.add((attendance.employee_id, attendance.project_id))
 
             if attendance.project_id and attendance.attendance_date:
-                self._update_project_estimation_line(attendance.project_id, attendance.attendance_date)
+                affected_estimation_dates.add((attendance.project_id, attendance.attendance_date))
 
             # Track which months need recalculation
             if attendance.employee_id and attendance.attendance_date:
@@ -435,9 +541,14 @@ class HrAttendance(models.Model):
                     attendance.attendance_date.year
                 ))
 
-        # Recalculate all attendances for affected employee-months
-        for emp_id, month, year in months_to_recalculate:
-            self._recalculate_month_attendances(emp_id, month, year)
+        for employee, project in affected_combinations:
+            self._update_project_employee_hours(employee, project)
+
+        for project, att_date in affected_estimation_dates:
+            self._update_project_estimation_line(project, att_date)
+
+        # Refresh the affected employee-month allocations, cost the new attendances
+        closed_records._refresh_month_costs(months_to_recalculate)
 
         return records
 
@@ -472,8 +583,19 @@ class HrAttendance(models.Model):
         if vals.get('check_out'):
             vals['check_out'] = self._remove_seconds(vals['check_out'])
 
+        self._check_period_open()
+
+        # Attendances open before and after the write have nothing to roll up or cost
+        if 'check_out' not in vals and not any(rec.check_out for rec in self):
+            res = super(HrAttendance, self).write(vals)
+            self._check_period_open()
+            return res
+
         # Update records
         res = super(HrAttendance, self).write(vals)
+        self._check_period_open()
+        self.env['hr.employee']._invalidate_hours_cache(
+            {old['employee_id'].id for old in old_data} | set(self.employee_id.ids))
 
         # Track affected combinations
         affected_combinations = set()
@@ -511,13 +633,17 @@ class HrAttendance(models.Model):
             project = self.env['project.project'].browse(proj_id)
             self._update_project_estimation_line(project, att_date)
 
-        # Recalculate affected months
-        for emp_id, month, year in months_to_recalculate:
-            self._recalculate_month_attendances(emp_id, month, year)
+        # Refresh the affected months, re-cost the written attendances
+        self._refresh_month_costs(months_to_recalculate)
 
         return res
 
     def unlink(self):
+        if self.env.su and self.env.context.get('attendance_archive'):
+            # moved to hr.attendance.archive by its cron: the rollups and costs already include them
+            self.env['hr.employee']._invalidate_hours_cache(self.employee_id.ids)
+            return super(HrAttendance, self).unlink()
+
         # Store data before deletion
         combinations_to_update = []
         estimation_dates_to_update = []
@@ -542,8 +668,12 @@ class HrAttendance(models.Model):
                         rec.attendance_date.year
                     ))
 
+        employee_ids = self.employee_id.ids
+        self._check_period_open()
+
         # Delete records
         res = super(HrAttendance, self).unlink()
+        self.env['hr.employee']._invalidate_hours_cache(employee_ids)
 
         # Update project records
         for combo in combinations_to_update:
@@ -556,9 +686,8 @@ class HrAttendance(models.Model):
             project = self.env['project.project'].browse(item['project_id'])
             self._update_project_estimation_line(project, item['attendance_date'])
 
-        # Recalculate remaining attendances in affected months
-        for emp_id, month, year in months_to_recalculate:
-            self._recalculate_month_attendances(emp_id, month, year)
+        # Refresh the allocations of the affected months
+        self.browse()._refresh_month_costs(months_to_recalculate)
 
         return res
 
@@ -566,12 +695,13 @@ class HrAttendance(models.Model):
         if not employee or not project:
             return
 
-        attendances = self.search([
+        domain = [
             ('employee_id', '=', employee.id),
             ('project_id', '=', project.id)
-        ])
-
-        total_hours = sum(attendances.mapped('worked_hours'))
+        ]
+        # archived rows are part of the totals whatever the user's access to the archive
+        archived = self.env['hr.attendance.archive'].sudo()._read_group(domain, [], ['worked_hours:sum'])
+        total_hours = sum(hours or 0.0 for [hours] in archived) + sum(self.search(domain).mapped('worked_hours'))
 
         project_emp = self.env['project.employee'].search([
             ('employee_id', '=', employee.id),
@@ -580,7 +710,7 @@ class HrAttendance(models.Model):
 
         if total_hours > 0:
             if project_emp:
-                project_emp.write({'employee_total_work': total_hours})
+                project_emp.with_context(mail_notrack=True).write({'employee_total_work': total_hours})
             else:
                 self.env['project.employee'].create({
                     'employee_id': employee.id,
@@ -596,12 +726,12 @@ class HrAttendance(models.Model):
         if not project or not attendance_date:
             return
 
-        attendances = self.search([
+        domain = [
             ('project_id', '=', project.id),
             ('attendance_date', '=', attendance_date)
-        ])
-
-        total_hours = sum(attendances.mapped('worked_hours'))
+        ]
+        archived = self.env['hr.attendance.archive'].sudo()._read_group(domain, [], ['worked_hours:sum'])
+        total_hours = sum(hours or 0.0 for [hours] in archived) + sum(self.search(domain).mapped('worked_hours'))
 
         estimation_line = self.env['project.estimation.line'].search([
             ('project_id', '=', project.id),
@@ -610,7 +740,7 @@ class HrAttendance(models.Model):
 
         if total_hours > 0:
             if estimation_line:
-                estimation_line.write({'estimate_man_hrs': total_hours})
+                estimation_line.with_context(mail_notrack=True).write({'estimate_man_hrs': total_hours})
             else:
                 self.env['project.estimation.line'].create({
                     'project_id': project.id,
@@ -633,6 +763,21 @@ class HrAttendance(models.Model):
         for rec in self:
             rec.total_hours_amount = (rec.worked_hours or 0.0) * (rec.rate_per_hour or 0.0)
 
+    @api.depends('employee_id', 'attendance_date', 'st_salary_total_hour', 'misc_amount')
+    def _compute_overhead_allocation(self):
+        Allocation = self.env['hr.attendance.allocation']
+        allocations = Allocation._get_allocation_map({
+            (rec.employee_id.id, rec.attendance_date.replace(day=1))
+            for rec in self if rec.employee_id and rec.attendance_date
+        })
+        for rec in self:
+            allocation = rec.attendance_date and Allocation._get_allocation_at(
+                allocations, rec.employee_id.id, rec.attendance_date)
+            for fname in ALLOCATION_FIELDS:
+                rec[fname] = allocation[fname] if allocation else 0.0
+            rec.total_expense = ((allocation.total_amount if allocation else 0.0)
+                                 + (rec.st_salary_total_hour or 0.0) + (rec.misc_amount or 0.0))
+
     @api.depends('attendance_date', 'resource_calendar_id')
     def _compute_normal_hour(self):
         for rec in self:
@@ -671,7 +816,7 @@ class HrAttendance(models.Model):
             rec.weekday_overtime_hours = 0.0
             rec.weekend_overtime_hours = 0.0
 
-            if not rec.check_in or not rec.employee_id or not rec.attendance_date:
+            if not rec.check_in or not rec.check_out or not rec.employee_id or not rec.attendance_date:
                 continue
 
             calendar = rec.employee_id.resource_calendar_id
@@ -739,7 +884,10 @@ class HrAttendance(models.Model):
         5. Public holidays
         6. Mandatory attendance days
         """
-        for rec in self:
+        # open attendances only get a minimal guard, the full validation runs once checked out
+        open_attendances = self.filtered(lambda rec: not rec.check_out)
+        open_attendances._check_open_attendances()
+        for rec in self - open_attendances:
             try:
                 self._validate_mandatory_fields(rec)
                 self._check_public_holiday(rec)
@@ -758,6 +906,32 @@ class HrAttendance(models.Model):
                 )
                 raise
 
+    def _check_open_attendances(self):
+        """One open attendance per employee, not starting inside a closed attendance"""
+        if not self:
+            return
+        if not all(self.mapped('employee_id')) or not all(self.mapped('check_in')):
+            raise ValidationError(_("An attendance needs an employee and a check-in time."))
+        if len(self.employee_id) < len(self):
+            raise ValidationError(_("An employee cannot have several attendances in progress."))
+        conflict = self.search(
+            Domain('id', 'not in', self.ids)
+            & Domain('employee_id', 'in', self.employee_id.ids)
+            & Domain.OR([Domain('check_out', '=', False)] + [
+                Domain('employee_id', '=', rec.employee_id.id)
+                & Domain('check_in', '<=', rec.check_in)
+                & Domain('check_out', '>', rec.check_in)
+                for rec in self
+            ]),
+            limit=1,
+        )
+        if conflict:
+            local_times = self._format_local_times(conflict)[conflict.id]
+            raise ValidationError(
+                _("Employee '%s' already has an attendance from %s to %s.")
+                % (conflict.employee_id.name, local_times['check_in'], local_times['check_out'] or _("now"))
+            )
+
     def _validate_mandatory_fields(self, rec):
         """Validate that all mandatory fields are filled."""
         missing_fields = []
@@ -777,8 +951,9 @@ class HrAttendance(models.Model):
 
         if not rec.check_in or not rec.check_out:
             # Convert to local time for display if values exist
-            check_in_display = self.convert_utc_to_local_time_only(rec.check_in) if rec.check_in else _("Not set")
-            check_out_display = self.convert_utc_to_local_time_only(rec.check_out) if rec.check_out else _("Not set")
+            local_times = self._format_local_times(rec)[rec.id]
+            check_in_display = local_times['check_in'] or _("Not set")
+            check_out_display = local_times['check_out'] or _("Not set")
 
             raise ValidationError(
                 _("Both Check-in and Check-out times are required.\n\n"
@@ -805,8 +980,9 @@ class HrAttendance(models.Model):
 
         if check_out_utc <= check_in_utc:
             # Convert to local time for display
-            check_in_local = self.convert_utc_to_local_time_only(check_in_utc)
-            check_out_local = self.convert_utc_to_local_time_only(check_out_utc)
+            local_tz = self._get_local_tz(rec.employee_id)
+            check_in_local = self._localize_time(check_in_utc, local_tz)
+            check_out_local = self._localize_time(check_out_utc, local_tz)
             print("================================================", check_in_local, check_out_local)
 
             raise ValidationError(
@@ -831,17 +1007,22 @@ class HrAttendance(models.Model):
 
         for ex in existing_records:
             ex_check_in = ex.check_in if ex.check_in.tzinfo else pytz.UTC.localize(ex.check_in)
-            ex_check_out = ex.check_out if ex.check_out.tzinfo else pytz.UTC.localize(ex.check_out)
-
-            # Check for time overlap
-            overlap = check_in_utc < ex_check_out and check_out_utc > ex_check_in
+            if not ex.check_out:
+                # attendance in progress
+                overlap = check_out_utc > ex_check_in
+                ex_check_out = pytz.UTC.localize(fields.Datetime.now())
+            else:
+                ex_check_out = ex.check_out if ex.check_out.tzinfo else pytz.UTC.localize(ex.check_out)
+                # Check for time overlap
+                overlap = check_in_utc < ex_check_out and check_out_utc > ex_check_in
 
             if overlap:
                 # Convert all times to local format for display
-                ex_check_in_local = self.convert_utc_to_local_time_only(ex_check_in)
-                ex_check_out_local = self.convert_utc_to_local_time_only(ex_check_out)
-                check_in_local = self.convert_utc_to_local_time_only(check_in_utc)
-                check_out_local = self.convert_utc_to_local_time_only(check_out_utc)
+                local_tz = self._get_local_tz(rec.employee_id)
+                ex_check_in_local = self._localize_time(ex_check_in, local_tz)
+                ex_check_out_local = self._localize_time(ex_check_out, local_tz)
+                check_in_local = self._localize_time(check_in_utc, local_tz)
+                check_out_local = self._localize_time(check_out_utc, local_tz)
 
                 if ex.project_id == rec.project_id:
                     raise ValidationError(
@@ -949,10 +1130,11 @@ class HrAttendance(models.Model):
 
             if overlap:
                 # Convert times to local timezone for display
-                check_in_local = self.convert_utc_to_local_time_only(check_in_dt, 'Asia/Kolkata')
-                check_out_local = self.convert_utc_to_local_time_only(check_out_dt, 'Asia/Kolkata')
-                holiday_start_local = self.convert_utc_to_local_time_only(holiday.date_from, 'Asia/Kolkata')
-                holiday_end_local = self.convert_utc_to_local_time_only(holiday.date_to, 'Asia/Kolkata')
+                local_tz = self._get_local_tz(rec.employee_id)
+                check_in_local = self._localize_time(check_in_dt, local_tz)
+                check_out_local = self._localize_time(check_out_dt, local_tz)
+                holiday_start_local = self._localize_time(holiday.date_from, local_tz)
+                holiday_end_local = self._localize_time(holiday.date_to, local_tz)
 
                 raise ValidationError(_(
                     "🚫 Public Holiday Time Conflict\n\n"
@@ -1020,7 +1202,8 @@ class HrAttendance(models.Model):
         if not attendance_ids:
             raise UserError("No attendance records selected for export.")
 
-        attendances = self.browse(attendance_ids)
+        # Flattened rows from the reporting view, read in a single query
+        attendances = self.env['hr.attendance.report'].browse(attendance_ids)
 
         date_type = wizard_data.get('date_type', 'today') if wizard_data else 'today'
 
@@ -1149,6 +1332,9 @@ class HrAttendance(models.Model):
 
         data_start_row = header_row + 1
 
+        # Convert the Time In / Time Out columns in one pass
+        local_times = self._format_local_times(attendances)
+
         for counter, attendance in enumerate(attendances, start=1):
             row = data_start_row + counter - 1
             col = 0
@@ -1169,13 +1355,13 @@ class HrAttendance(models.Model):
             col += 1
             worksheet.write(row, col, attendance.enquiry_department_code or '-', cell_format)
             col += 1
-            worksheet.write(row, col, attendance.client_id.name if attendance.client_id else '-', cell_format)
+            worksheet.write(row, col, attendance.client_name or '-', cell_format)
             col += 1
             worksheet.write(row, col, attendance.vessel_name or '-', cell_format)
             col += 1
-            worksheet.write(row, col, attendance.employee_id.name if attendance.employee_id else '-', cell_format)
+            worksheet.write(row, col, attendance.employee_name or '-', cell_format)
             col += 1
-            worksheet.write(row, col, attendance.designation_id.name if attendance.designation_id else '-', cell_format)
+            worksheet.write(row, col, attendance.designation_name or '-', cell_format)
             col += 1
             worksheet.write(row, col, attendance.company_code or '-', cell_format)
             col += 1
@@ -1185,17 +1371,16 @@ class HrAttendance(models.Model):
             col += 1
             worksheet.write(row, col, attendance.employee_department or '-', cell_format)
             col += 1
-            worksheet.write(row, col, attendance.work_location_id.name if attendance.work_location_id else '-',
-                            cell_format)
+            worksheet.write(row, col, attendance.work_location_name or '-', cell_format)
             col += 1
 
-            # Time In - Using convert_utc_to_local_time_only method
-            time_in = self.convert_utc_to_local_time_only(attendance.check_in, 'Asia/Kolkata')
+            # Time In
+            time_in = local_times[attendance.id]['check_in']
             worksheet.write(row, col, time_in if time_in else '-', time_format)
             col += 1
 
-            # Time Out - Using convert_utc_to_local_time_only method
-            time_out = self.convert_utc_to_local_time_only(attendance.check_out, 'Asia/Kolkata')
+            # Time Out
+            time_out = local_times[attendance.id]['check_out']
             worksheet.write(row, col, time_out if time_out else '-', time_format)
             col += 1
 
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from bisect import bisect_right
+from datetime import date
+
+from odoo import api, fields, models
+
+COST_PROFILE_FIELDS = [
+    'rate_per_hour', 'salary_rate_per_hour', 'cpf_amount', 'levy_amount', 'accomodation_amount',
+    'transportation_amount', 'insurance_amount', 'admin_cost_amount', 'certification_audit_cost_amount',
+    'office_rent_amount', 'oh_cost_amount', 'others_cost_amount',
+]
+# effective date of the profile holding the costs an employee had before its first dated change
+COST_PROFILE_BASELINE_DATE = date(2000, 1, 1)
+
+
+class HrEmployeeCostProfile(models.Model):
+    """
+    Rates and monthly costs of an employee from ``date_from`` until the next
+    profile. Attendances are costed with the profile in effect on their date,
+    so a change only re-costs the attendances from its effective date on.
+    """
+    _name = 'hr.employee.cost.profile'
+    _description = 'Employee Cost Profile'
+    _order = 'employee_id, date_from'
+
+    employee_id = fields.Many2one('hr.employee', string="Employee", required=True, index=True, ondelete='cascade')
+    date_from = fields.Date(string="Effective From", required=True, default=fields.Date.context_today)
+    currency_id = fields.Many2one(related='employee_id.currency_id')
+    rate_per_hour = fields.Monetary(string="Rate Per Hour")
+    salary_rate_per_hour = fields.Monetary(string="Salary Rate Per Hour")
+    cpf_amount = fields.Monetary(string="CPF")
+    levy_amount = fields.Monetary(string="Levy")
+    accomodation_amount = fields.Monetary(string="Accommodation")
+    transportation_amount = fields.Monetary(string="Transportation")
+    insurance_amount = fields.Monetary(string="Insurance")
+    admin_cost_amount = fields.Monetary(string="Admin Cost")
+    certification_audit_cost_amount = fields.Monetary(string="Certification / Audit Cost")
+    office_rent_amount = fields.Monetary(string="Office Rent")
+    oh_cost_amount = fields.Monetary(string="OH Cost")
+    others_cost_amount = fields.Monetary(string="Others")
+
+    _employee_date_unique = models.Constraint(
+        'UNIQUE(employee_id, date_from)',
+        'An employee cannot have two cost profiles starting on the same date.',
+    )
+
+    @api.model
+    def _get_validity_index(self, employee_ids):
+        """Return {employee id: ([date_from, ...], [profile, ...])}, both sorted by date"""
+        index = {}
+        for profile in self.sudo().search([('employee_id', 'in', list(employee_ids))]):
+            dates, profiles = index.setdefault(profile.employee_id.id, ([], []))
+            dates.append(profile.date_from)
+            profiles.append(profile)
+        return index
+
+    @api.model
+    def _get_costs_at(self, index, employee, on_date):
+        """
+        Costs of ``employee`` in effect on ``on_date``, bisected in the validity
+        index. Employees without profile are costed with their current values.
+        Profiled employees start with a baseline dated COST_PROFILE_BASELINE_DATE,
+        so only dates before the baseline fall back to the first profile.
+        """
+        dates, profiles = index.get(employee.id, ((), ()))
+        if profiles:
+            source = profiles[max(bisect_right(dates, on_date) - 1, 0)]
+        else:
+            source = employee
+        return {fname: source[fname] or 0.0 for fname in COST_PROFILE_FIELDS}
+
+    @api.model
+    def _create_baselines(self, employees):
+        """Keep the current costs of employees without profile before their first dated change"""
+        with_profile = set(self.search([('employee_id', 'in', employees.ids)]).employee_id.ids)
+        self.with_context(skip_cost_recompute=True).create([
+            dict({fname: employee[fname] for fname in COST_PROFILE_FIELDS},
+                 employee_id=employee.id, date_from=COST_PROFILE_BASELINE_DATE)
+            for employee in employees if employee.id not in with_profile
+        ])
+
+    @api.model
+    def _set_profiles(self, employees, date_from):
+        """Create or update the profiles starting on ``date_from`` with the current costs of ``employees``"""
+        existing = {
+            profile.employee_id.id: profile
+            for profile in self.search([('employee_id', 'in', employees.ids), ('date_from', '=', date_from)])
+        }
+        new_vals = []
+        for employee in employees:
+            vals = {fname: employee[fname] for fname in COST_PROFILE_FIELDS}
+            if employee.id in existing:
+                existing[employee.id].write(vals)
+            else:
+                new_vals.append(dict(vals, employee_id=employee.id, date_from=date_from))
+        self.create(new_vals)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        if not self.env.context.get('skip_cost_recompute'):
+            # the first dated profile must not re-cost the attendances before its date
+            today = fields.Date.context_today(self)
+            employee_ids = {
+                vals['employee_id'] for vals in vals_list
+                if vals.get('employee_id')
+                and (fields.Date.to_date(vals.get('date_from')) or today) > COST_PROFILE_BASELINE_DATE
+            }
+            self._create_baselines(self.env['hr.employee'].browse(employee_ids))
+        profiles = super().create(vals_list)
+        profiles._apply_cost_changes(profiles._get_recost_starts())
+        return profiles
+
+    def write(self, vals):
+        starts = self._get_recost_starts()
+        res = super().write(vals)
+        for employee_id, date_from in self._get_recost_starts().items():
+            starts[employee_id] = min(starts.get(employee_id, date_from), date_from)
+        self._apply_cost_changes(starts)
+        return res
+
+    def unlink(self):
+        starts = self._get_recost_starts()
+        res = super().unlink()
+        self._apply_cost_changes(starts)
+        return res
+
+    def _get_recost_starts(self):
+        starts = {}
+        for profile in self:
+            employee_id = profile.employee_id.id
+            starts[employee_id] = min(starts.get(employee_id, profile.date_from), profile.date_from)
+        return starts
+
+    @api.model
+    def _apply_cost_changes(self, starts):
+        """
+        Align the employees' current costs with the profile in effect today and
+        re-cost their attendances from the earliest changed date on.
+        """
+        if not starts or self.env.context.get('skip_cost_recompute'):
+            return
+        employees = self.env['hr.employee'].browse(list(starts)).exists()
+        index = self._get_validity_index(employees.ids)
+        today = fields.Date.context_today(self)
+        for employee in employees.filtered(lambda e: e.id in index):
+            costs = self._get_costs_at(index, employee, today)
+            changed = {fname: value for fname, value in costs.items() if employee[fname] != value}
+            if changed:
+                employee.with_context(skip_cost_profile=True).write(changed)
+        self.env['hr.attendance']._recost_from(
+            {employee.id: starts[employee.id] for employee in employees}, index)
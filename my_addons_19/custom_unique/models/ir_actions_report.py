@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+import base64
+
+from odoo import models
+
+QUOTATION_REPORT_NAME = 'sale.report_saleorder'
+
+
+class IrActionsReport(models.Model):
+    _inherit = 'ir.actions.report'
+
+    def _render_qweb_pdf(self, report_ref, res_ids=None, data=None):
+        """
+        Serve the PDF of an unchanged draft/approved quotation from its cached
+        attachment instead of rendering it again with wkhtmltopdf.
+        """
+        report = self._get_report(report_ref)
+        if report.report_name != QUOTATION_REPORT_NAME or data or not res_ids or len(res_ids) != 1:
+            return super()._render_qweb_pdf(report_ref, res_ids=res_ids, data=data)
+
+        order = self.env['sale.order'].browse(res_ids)
+        if order.state not in ('draft', 'approved'):
+            return super()._render_qweb_pdf(report_ref, res_ids=res_ids, data=data)
+
+        cache_key = order._get_quotation_pdf_cache_key(report)
+        cached = order._get_quotation_pdf_cache()
+        if cached and cached.description == cache_key:
+            return base64.b64decode(cached.datas), 'pdf'
+
+        pdf_content, report_type = super()._render_qweb_pdf(report_ref, res_ids=res_ids, data=data)
+        order._set_quotation_pdf_cache(pdf_content, cache_key)
+        return pdf_content, report_type
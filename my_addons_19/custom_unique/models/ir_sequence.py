@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+import logging
+
+from odoo import api, models, tools, SUPERUSER_ID
+
+_logger = logging.getLogger(__name__)
+
+
+class IrSequence(models.Model):
+    _inherit = 'ir.sequence'
+
+    def _next_block(self, count):
+        """
+        Reserve ``count`` numbers of this sequence in a single call and return
+        them formatted like ``_next()`` would (prefix, padding and suffix).
+        """
+        self.ensure_one()
+        if count <= 0:
+            return []
+        if self.use_date_range:
+            return [self._next() for _i in range(count)]
+
+        if self.implementation == 'standard':
+            numbers = self._select_nextval_block(self.id, count)
+        else:
+            self.env.cr.execute("SELECT number_next FROM ir_sequence WHERE id = %s FOR UPDATE NOWAIT", [self.id])
+            number_next = self.env.cr.fetchone()[0]
+            self.env.cr.execute(
+                "UPDATE ir_sequence SET number_next = number_next + %s WHERE id = %s",
+                [self.number_increment * count, self.id],
+            )
+            self.invalidate_recordset(['number_next'])
+            numbers = [number_next + i * self.number_increment for i in range(count)]
+        return [self.get_next_char(number) for number in numbers]
+
+    @api.model
+    def _select_nextval_block(self, sequence_id, count):
+        self.env.cr.execute(
+            "SELECT nextval('ir_sequence_%03d') FROM generate_series(1, %%s)" % sequence_id, [count]
+        )
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    @api.model
+    def _next_block_by_partition(self, sequence_code, partition, count, seed=None):
+        """
+        Reserve ``count`` numbers of the ``sequence_code`` sequence dedicated to
+        ``partition``, and return them zero-padded. Callers key partitions on
+        what the numbers are rendered with, so equal renderings share numbers.
+
+        Partitions are standard (PostgreSQL) sequences created on first use, so
+        concurrent creators never wait on a shared ir_sequence row. ``seed`` is
+        called with the environment creating the partition and returns the
+        highest number already issued in it, the partition continues from there.
+        Returns an empty list when no ``sequence_code`` sequence is defined.
+        """
+        if count <= 0:
+            return []
+        partition_code = '%s/%s' % (sequence_code, partition)
+        partition = self._get_partition_sequence(partition_code)
+        if not partition:
+            # the sequence defined in data acts as the template of its partitions
+            template = self.sudo().search([('code', '=', sequence_code)], limit=1)
+            if not template:
+                return []
+            partition = self._create_partition_sequence(template, partition_code, seed)
+        sequence_id, padding = partition
+        return ['%0*d' % (padding, number) for number in self._select_nextval_block(sequence_id, count)]
+
+    @api.model
+    @tools.ormcache('partition_code')
+    def _get_partition_sequence(self, partition_code):
+        """(sequence id, padding) of an existing partition, None when it is not created yet"""
+        partition = self.sudo().search([('code', '=', partition_code)], limit=1)
+        return (partition.id, partition.padding) if partition else None
+
+    @api.model
+    def _create_partition_sequence(self, template, partition_code, seed=None):
+        """
+        Create the partition in its own committed transaction, serialized on an
+        advisory lock so two workers cannot create the same partition twice.
+        The PostgreSQL sequence is usable right away from the caller's cursor.
+        """
+        with self.env.registry.cursor() as cr:
+            cr.execute("SELECT pg_advisory_lock(hashtext(%s))", [partition_code])
+            try:
+                # commit to get a snapshot that sees partitions created while waiting
+                cr.commit()
+                env = api.Environment(cr, SUPERUSER_ID, {})
+                partition = env['ir.sequence'].search([('code', '=', partition_code)], limit=1)
+                if not partition:
+                    partition = env['ir.sequence'].create({
+                        'name': '%s (%s)' % (template.name, partition_code),
+                        'code': partition_code,
+                        'implementation': 'standard',
+                        'padding': template.padding or 3,
+                        # a partition can span companies rendered with the same code
+                        'company_id': False,
+                        'number_next': (seed(env) if seed else 0) + 1,
+                    })
+                    _logger.info("Created reference sequence partition %s from %s",
+                                 partition_code, partition.number_next)
+                result = (partition.id, partition.padding)
+                cr.commit()
+            finally:
+                # session locks survive rollbacks and pooled connections: always release
+                cr.rollback()
+                cr.execute("SELECT pg_advisory_unlock(hashtext(%s))", [partition_code])
+        self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        has_code = any(sequence.code for sequence in self)
+        res = super().unlink()
+        if has_code:
+            self.env.registry.clear_cache()
+        return res
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from odoo import api, fields, models
+
+
+class MailMail(models.Model):
+    _inherit = 'mail.mail'
+
+    # queued by the partner confirmation/approval flows, sent by their own cron
+    partner_mail_queued = fields.Boolean(index='btree_not_null', copy=False)
+
+    @api.model
+    def process_email_queue(self, email_ids=None, batch_size=1000):
+        # the general queue leaves the partner mails to their cron while it runs, so
+        # the two crons never pick the same mail
+        if not email_ids and self._is_partner_mail_cron_active():
+            filters = list(self.env.context.get('filters') or []) + [('partner_mail_queued', '=', False)]
+            self = self.with_context(filters=filters)
+        return super().process_email_queue(email_ids=email_ids, batch_size=batch_size)
+
+    @api.model
+    def _is_partner_mail_cron_active(self):
+        cron = self.env.ref('custom_unique.ir_cron_partner_mail_queue', raise_if_not_found=False)
+        return bool(cron and cron.sudo().active)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+import json
+import time
+from collections import defaultdict, deque
+
+from odoo import api, models
+
+NOTIFICATION_QUEUE_KEY = 'custom_unique.notification_queue'
+DEFAULT_RATE_LIMIT = 10
+DEFAULT_RATE_WINDOW = 60
+
+# (dbname, recipient) -> send times of its last notifications, per worker
+_RECENT_NOTIFICATIONS = defaultdict(deque)
+
+
+class NotificationDispatcher(models.AbstractModel):
+    """
+    Collects bus notifications during the transaction and sends them with a
+    single ``bus.bus._sendmany`` when it commits: identical messages to the
+    same recipient are sent once, and each recipient gets at most
+    ``custom_unique.notification_rate_limit`` notifications per
+    ``custom_unique.notification_rate_window`` seconds (0 disables the limit).
+    """
+    _name = 'notification.dispatcher'
+    _description = 'Batched Notification Dispatcher'
+
+    @api.model
+    def _queue(self, target, notification_type, payload):
+        """Same signature as ``bus.bus._sendone``, delivered when the transaction commits"""
+        self._queue_many([(target, notification_type, payload)])
+
+    @api.model
+    def _queue_many(self, notifications):
+        """Same signature as ``bus.bus._sendmany``, delivered when the transaction commits"""
+        precommit = self.env.cr.precommit
+        queue = precommit.data.get(NOTIFICATION_QUEUE_KEY)
+        if queue is None:
+            queue = precommit.data[NOTIFICATION_QUEUE_KEY] = {}
+            precommit.add(self._flush_notifications)
+        for target, notification_type, payload in notifications:
+            key = (self._get_recipient_key(target), notification_type,
+                   json.dumps(payload, sort_keys=True, default=str))
+            queue.setdefault(key, (target, notification_type, payload))
+
+    @api.model
+    def _get_recipient_key(self, target):
+        if isinstance(target, models.BaseModel):
+            return (target._name, tuple(target.ids))
+        return repr(target)
+
+    def _get_rate_limit(self):
+        ICP = self.env['ir.config_parameter'].sudo()
+        limit = int(ICP.get_param('custom_unique.notification_rate_limit', DEFAULT_RATE_LIMIT))
+        window = int(ICP.get_param('custom_unique.notification_rate_window', DEFAULT_RATE_WINDOW))
+        return limit, window
+
+    def _flush_notifications(self):
+        # bus.bus stores the messages in this transaction and pushes them after commit
+        queue = self.env.cr.precommit.data.pop(NOTIFICATION_QUEUE_KEY, {})
+        if not queue:
+            return
+        notifications = self._apply_rate_limit(list(queue.values()))
+        if notifications:
+            self.env['bus.bus'].sudo()._sendmany(notifications)
+
+    def _apply_rate_limit(self, notifications):
+        """Drop what exceeds each recipient's quota and replace it with one summary toast"""
+        limit, window = self._get_rate_limit()
+        if limit <= 0:
+            return notifications
+
+        now = time.monotonic()
+        allowed = []
+        held_back = {}
+        sent = defaultdict(int)
+        for target, notification_type, payload in notifications:
+            recipient = (self.env.cr.dbname, self._get_recipient_key(target))
+            recent = _RECENT_NOTIFICATIONS[recipient]
+            while recent and recent[0] <= now - window:
+                recent.popleft()
+            if len(recent) + sent[recipient] < limit:
+                sent[recipient] += 1
+                allowed.append((target, notification_type, payload))
+            else:
+                count = held_back.get(recipient, (target, 0))[1]
+                held_back[recipient] = (target, count + 1)
+
+        # the quota is only used by notifications of committed transactions
+        @self.env.cr.postcommit.add
+        def record_sent():
+            for recipient, count in sent.items():
+                _RECENT_NOTIFICATIONS[recipient].extend([now] * count)
+
+        for target, count in held_back.values():
+            allowed.append((
+                target,
+                'simple_notification',
+                {
+                    'type': 'warning',
+                    'message': f"{count} more notification(s) were not shown, please check your documents.",
+                    'sticky': False,
+                },
+            ))
+        return allowed
@@ -2,13 +2,19 @@
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
 from odoo import models, fields, api
-from datetime import datetime
 from odoo.exceptions import ValidationError
 from pygments.lexer import default
 
 
 class ProjectProject(models.Model):
-    _inherit = 'project.project'
+    _name = 'project.project'
+    _inherit = ['project.project', 'document.reference.mixin']
+
+    _reference_field = 'project_ref'
+    _reference_sequence_code = 'project.project'
+    _reference_doc_code = 'PRO'
+    _reference_use_department = False
+    _reference_default_number = 'OT-000'
 
     project_ref = fields.Char(string="Project No.", readonly=True, copy=False, index=True, default='New', tracking=True)
     sale_order_id = fields.Many2one('sale.order', string='Quotation', store=True, readonly=False, tracking=True)
@@ -76,20 +82,19 @@ class ProjectProject(models.Model):
     location = fields.Char(string="Location", related="sale_order_id.location", tracking=True)
     cancel_reason = fields.Text(string="Reason", tracking=True)
 
+    def _get_reference_company_department(self, vals_list):
+        # Without an explicit company the project follows its quotation's client
+        orders = self.env['sale.order'].browse({vals['sale_order_id'] for vals in vals_list if vals.get('sale_order_id')})
+        order_companies = {order.id: order.client_id.company_id.id for order in orders}
+        return [
+            (vals.get('company_id') or order_companies.get(vals.get('sale_order_id')), False)
+            for vals in vals_list
+        ]
+
     @api.model_create_multi
     def create(self, vals_list):
-        records = super().create(vals_list)
-        for record in records:
-            if not record.project_ref or record.project_ref == 'New':
-                company = record.company_id
-                dept = record.department_id
-                current_year = datetime.now().year
-                seq_code = self.env['ir.sequence'].next_by_code('project.project') or 'OT-000'
-                seq_number = seq_code.split('-')[-1]
-                company_code = company.code if hasattr(company, 'code') and company.code else 'CMP'
-                dept_code = dept.code if hasattr(dept, 'code') and dept.code else 'DEPT'
-                record.project_ref = f"{company_code}-PRO-{current_year}-{seq_number}"
-        return records
+        self._assign_references(vals_list)
+        return super().create(vals_list)
 
     def action_cancel_project(self):
         print("============================")
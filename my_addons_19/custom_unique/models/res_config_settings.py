@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from odoo import fields, models
+
+
+class ResConfigSettings(models.TransientModel):
+    _inherit = 'res.config.settings'
+
+    partner_confirmation_mail_sync = fields.Boolean(
+        string="Send Partner Confirmation Mails Immediately",
+        config_parameter='custom_unique.partner_confirmation_mail_sync',
+        help="Send the boss confirmation mail of new partners during the request instead of queuing it.")
+    partner_approval_mail_sync = fields.Boolean(
+        string="Send Partner Approval Mails Immediately",
+        config_parameter='custom_unique.partner_approval_mail_sync',
+        help="Send the partner approval mail during the request instead of queuing it.")
+    attendance_archive_months = fields.Integer(
+        string="Archive Attendances After (Months)",
+        config_parameter='custom_unique.attendance_archive_months',
+        help="Attendances of closed periods older than this number of months are aggregated per employee, "
+             "project and day and removed. 0 disables the archive.")
+    attendance_archive_export = fields.Boolean(
+        string="Export Archived Attendances",
+        config_parameter='custom_unique.attendance_archive_export',
+        help="Keep the archived attendance rows as a compressed CSV attachment.")
@@ -1,23 +1,36 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
-from odoo import models, fields, api, _
-from datetime import datetime
+from odoo import models, fields, api, _, Command
+import hashlib
 from odoo.exceptions import ValidationError, UserError
 
+BOSS_APPROVAL_THRESHOLD = 25000
+QUOTATION_LINES_PER_PAGE = 4
+# qweb templates printed by the quotation report, the views inheriting them are included
+QUOTATION_REPORT_TEMPLATES = (
+    'sale.report_saleorder', 'sale.report_saleorder_document', 'custom_unique.weblearns_layout',
+)
+
 
 class SaleOrder(models.Model):
-    _inherit = 'sale.order'
+    _name = 'sale.order'
+    _inherit = ['sale.order', 'document.reference.mixin']
+
+    _reference_field = 'name'
+    _reference_sequence_code = 'sale.enquiry'
+    _reference_doc_code = 'QT'
+    _reference_default_number = 'OT-000'
 
     sale_enquiry_id = fields.Many2one('sale.enquiry', string='Enquiry', index=True, store=True, tracking=True)
     enquiry_id = fields.Many2one('enquiry.lead', string='Enquiry', index=True, related="sale_enquiry_id.enquiry_id",
-                                 tracking=True)
+                                 store=True, tracking=True)
     department_id = fields.Many2one("enquiry.department", string="Department", required=True,
-                                    related="enquiry_id.department_id", store=True, tracking=True)
+                                    compute='_compute_dimensions', store=True, index=True, tracking=True)
     enquiry_date = fields.Datetime(string="Enquiry Date", help="Date when the enquiry was created.",
                                    related="enquiry_id.create_date", store=True, tracking=True)
     client_id = fields.Many2one('res.partner', string='Company Name', domain="[('parent_id', '=', False)]",
-                                related="enquiry_id.client_id", tracking=True)
+                                compute='_compute_dimensions', store=True, index=True, tracking=True)
     contact_person_id = fields.Many2one('res.partner', string='Contact Name', domain="[('parent_id', '=', client_id)]",
                                         related="enquiry_id.contact_person_id", tracking=True)
     mobile = fields.Char(string="Contact No.", readonly=False,
@@ -37,16 +50,16 @@ class SaleOrder(models.Model):
         ('low', 'Low'),
         ('medium', 'Medium'),
         ('high', 'High'),
-    ], string='Priority', tracking=True, related="enquiry_id.priority")
+    ], string='Priority', tracking=True, compute='_compute_dimensions', store=True, index=True)
     sector = fields.Selection([
         ('marine', 'Marine'),
         ('process', 'Process'),
         ('construction', 'Construction'),
         ('employment_agency', 'Employment Agency'),
-    ], string='Sector', related='client_id.sector', tracking=True)
+    ], string='Sector', compute='_compute_dimensions', store=True, index=True, tracking=True)
     company_id = fields.Many2one('res.company', string='Company', required=False, index=True,
                                  related='client_id.company_id', store=True, tracking=True)
-    enq_probability = fields.Float(string='Probability (%)', related="enquiry_id.enq_probability", tracking=True)
+    enq_probability = fields.Float(string='Probability (%)', compute='_compute_dimensions', store=True, tracking=True)
     deadline = fields.Datetime(string="Deadline & Time", related='sale_enquiry_id.deadline', tracking=True)
     project_id = fields.Many2one('project.project', string='Project', required=False, tracking=True)
     project_number = fields.Char(string='Project Number', required=False, related="project_id.project_ref",
@@ -69,9 +82,10 @@ class SaleOrder(models.Model):
     ], string="GST", default='9_percent', tracking=True)
     yeard_id = fields.Many2one('res.partner', string='Yeard', domain="[('parent_id', '=', False)]",
                                related='sale_enquiry_id.yeard_id', tracking=True)
-    user_id = fields.Many2one('res.users', string='Sales Person', default=lambda self: self.env.user,
-                              related='enquiry_id.user_id', tracking=True)
+    user_id = fields.Many2one('res.users', string='Sales Person', compute='_compute_user_id', store=True,
+                              readonly=False, index=True, tracking=True)
     boss_approval_required = fields.Boolean(tracking=True)
+    boss_approval_threshold = fields.Integer(string="Approval Threshold", compute='_compute_boss_approval_threshold')
     calcification = fields.Selection([
         ('client', 'Client'),
         ('shipyard', 'Shipyard'),
@@ -81,7 +95,7 @@ class SaleOrder(models.Model):
         ('process_plant', 'Process Plant'),
         ('construction', 'Construction'),
         ('power_plant', 'Power Plant'),
-    ], string='Calcification', related='enquiry_id.calcification', tracking=True)
+    ], string='Calcification', compute='_compute_dimensions', store=True, index=True, tracking=True)
     discount_type = fields.Selection([
         ('percent', 'Percentage'),
         ('amount', 'Amount'),
@@ -90,12 +104,32 @@ class SaleOrder(models.Model):
     scope = fields.Text(string="Scope", tracking=True)
     net_amount_total_words = fields.Char(string="Amount total in words", compute="_compute_net_amount_total_words",
                                          tracking=True)
+    quotation_pdf_cache = fields.Binary(string="Cached Quotation PDF", attachment=True, copy=False,
+                                        groups='base.group_system')
     approval_state = fields.Selection([
         ('draft', 'Draft'),
         ('approved', 'Approved'),
         ('cancelled', 'Cancelled')
     ], string="Approval Status", default='draft', tracking=True)
 
+    @api.depends('enquiry_id')
+    def _compute_dimensions(self):
+        # stored copies of the enquiry dimensions, upstream changes come from dimension.propagation.queue
+        for order in self:
+            enquiry = order.enquiry_id
+            order.client_id = enquiry.client_id
+            order.department_id = enquiry.department_id
+            order.priority = enquiry.priority
+            order.calcification = enquiry.calcification
+            order.sector = enquiry.client_id.sector
+            order.enq_probability = enquiry.enq_probability
+
+    @api.depends('enquiry_id')
+    def _compute_user_id(self):
+        super()._compute_user_id()
+        for order in self.filtered('enquiry_id'):
+            order.user_id = order.enquiry_id.user_id
+
     @api.depends('net_amount', 'currency_id')
     def _compute_net_amount_total_words(self):
         for order in self:
@@ -135,33 +169,7 @@ class SaleOrder(models.Model):
 
     @api.model_create_multi
     def create(self, vals_list):
-        for vals in vals_list:
-            if vals.get('name', _("New")) == _("New"):
-                seq_date = fields.Datetime.context_timestamp(
-                    self, fields.Datetime.to_datetime(vals['date_order'])
-                ) if 'date_order' in vals else None
-
-                company_id = vals.get('company_id')
-                dept_id = vals.get('department_id')
-
-                current_year = datetime.now().year
-                seq_code = self.env['ir.sequence'].next_by_code('sale.enquiry') or 'OT-000'
-                seq_number = seq_code.split('-')[-1]
-
-                company_code = 'CMP'
-                if company_id:
-                    company = self.env['res.company'].browse(company_id)
-                    if company and hasattr(company, 'code') and company.code:
-                        company_code = company.code
-
-                dept_code = 'DEPT'
-                if dept_id:
-                    dept = self.env['enquiry.department'].browse(dept_id)
-                    if dept and hasattr(dept, 'code') and dept.code:
-                        dept_code = dept.code
-
-                vals['name'] = f"{company_code}-QT-{dept_code}-{current_year}-{seq_number}"
-
+        self._assign_references(vals_list)
         return super().create(vals_list)
 
     @api.depends('order_line.price_subtotal', 'discount_type', 'discount_percent', 'discount_amt', 'gst_type')
@@ -191,40 +199,60 @@ class SaleOrder(models.Model):
             rec.net_amount = net_amount
 
     def action_approve_quotation(self):
-        boss_group = self.env.ref("custom_unique.group_unique_administrator")
+        """
+        Approve the selected quotations in one go: orders up to the threshold
+        (or any order when the user is a boss) are approved with a single write,
+        the others are sent together to the boss approval wizard.
+        """
+        if any(not rec.order_line for rec in self):
+            raise UserError("You cannot approve this quotation because there are no items added.")
+
+        is_boss = self.env.user in self.env['res.partner']._get_boss_directory()['approvers']
+        to_approve_ids, boss_required_ids = [], []
         for rec in self:
-            if not rec.order_line:
-                raise UserError("You cannot approve this quotation because there are no items added.")
-
-            if rec.net_amount > 25000:
-                if self.env.user in boss_group.user_ids:
-                    rec.state = 'approved'
-                    if rec.user_id:
-                        message = f"Hello {rec.user_id.name}, your quotation '{rec.name}' (Amount: {rec.net_amount}) has been approved by the Boss!"
-                        self.env['bus.bus']._sendone(
-                            rec.user_id.partner_id,
-                            'simple_notification',
-                            {
-                                'type': 'success',
-                                'message': message,
-                                'sticky': True,
-                                'className': 'bg-success',
-                            }
-                        )
-                    continue
-                return {
-                    'type': 'ir.actions.act_window',
-                    'name': 'Boss Approval Required',
-                    'res_model': 'approve.sale.quotation.wizard',
-                    'view_mode': 'form',
-                    'view_id': self.env.ref('custom_unique.view_approve_sale_order_wizard').id,
-                    'target': 'new',
-                    'context': {
-                        'default_sale_order_id': rec.id,
-                    }
-                }
+            if rec.net_amount > BOSS_APPROVAL_THRESHOLD and not is_boss:
+                boss_required_ids.append(rec.id)
             else:
-                rec.state = 'approved'
+                to_approve_ids.append(rec.id)
+
+        to_approve = self.browse(to_approve_ids)
+        if to_approve:
+            to_approve.write({'state': 'approved'})
+            if is_boss:
+                to_approve.filtered(lambda rec: rec.net_amount > BOSS_APPROVAL_THRESHOLD)._notify_boss_approved()
+
+        if boss_required_ids:
+            return {
+                'type': 'ir.actions.act_window',
+                'name': 'Boss Approval Required',
+                'res_model': 'approve.sale.quotation.wizard',
+                'view_mode': 'form',
+                'view_id': self.env.ref('custom_unique.view_approve_sale_order_wizard').id,
+                'target': 'new',
+                'context': {
+                    'default_sale_order_ids': [Command.set(boss_required_ids)],
+                }
+            }
+
+    def _notify_boss_approved(self):
+        """Tell each salesperson, in one notification, which of their quotations the boss approved"""
+        notifications = []
+        for user, orders in self.grouped('user_id').items():
+            if not user:
+                continue
+            quotations = ', '.join(f"'{rec.name}' (Amount: {rec.net_amount})" for rec in orders)
+            notifications.append((
+                user.partner_id,
+                'simple_notification',
+                {
+                    'type': 'success',
+                    'message': f"Hello {user.name}, your quotation(s) {quotations} have been approved by the Boss!",
+                    'sticky': True,
+                    'className': 'bg-success',
+                },
+            ))
+        if notifications:
+            self.env['notification.dispatcher']._queue_many(notifications)
 
     def action_confirm(self):
         for rec in self:
@@ -257,6 +285,84 @@ class SaleOrder(models.Model):
     def _confirmation_error_message(self):
         return False
 
+    def _get_existing_invoice_by_order(self):
+        """Return ``{order_id: invoice_id}`` for the orders already invoiced, in one query."""
+        groups = self.env['account.move']._read_group([
+            ('sale_order_id', 'in', self.ids),
+            ('move_type', '=', 'out_invoice'),
+            ('state', '!=', 'cancel'),
+        ], ['sale_order_id'], ['id:min'])
+        return {order.id: invoice_id for order, invoice_id in groups}
+
+    def _get_income_account_by_product(self):
+        """Income account of every product on the orders (product first, then its category)."""
+        products = self.order_line.filtered(lambda line: not line.display_type).product_id
+        accounts = {
+            product.id: product.property_account_income_id or product.categ_id.property_account_income_categ_id
+            for product in products
+        }
+        missing = products.filtered(lambda product: not accounts[product.id])
+        if missing:
+            raise UserError(_(
+                'Please define income account for product: %s or its category.'
+            ) % ', '.join(missing.mapped('name')))
+        return accounts
+
+    def _prepare_custom_invoice_vals(self, income_accounts):
+        """Invoice values with ALL custom fields and lines of the sale order"""
+        self.ensure_one()
+        return {
+            'move_type': 'out_invoice',
+            'partner_id': self.partner_id.id,
+            'invoice_date': fields.Date.today(),
+            'invoice_origin': self.name,
+            'sale_order_id': self.id,
+
+            # Transfer all custom fields
+            'subject': self.subject,
+            'location': self.location,
+            'gst_type': self.gst_type,
+            'discount_type': self.discount_type,
+            'discount_percent': self.discount_percent,
+            'discount_amt': self.discount_amt,
+            'gst_percent': self.gst_percent,
+            'currency_id': self.currency_id.id,
+            'company_id': self.company_id.id if self.company_id else self.env.company.id,
+            'invoice_line_ids': [
+                # sections and notes have no product: they become the same kind of invoice line
+                Command.create({
+                    'display_type': line.display_type,
+                    'name': line.name,
+                })
+                if line.display_type else
+                Command.create({
+                    'product_id': line.product_id.id,
+                    'name': line.name,
+                    'quantity': line.product_uom_qty,
+                    'product_uom_id': line.product_uom_id.id,
+                    'price_unit': line.price_unit,
+                    'discount': line.discount,
+                    'account_id': income_accounts[line.product_id.id].id,
+
+                    # Transfer custom fields
+                    'product_description': line.product_description,
+                    'remarks': line.remarks,
+                    'service_note': line.service_note,
+                    'uom_id': line.uom_id.id if line.uom_id else False,
+                    'cost_of_sales': line.cost_of_sales,
+                })
+                for line in self.order_line
+            ],
+        }
+
+    def _create_custom_invoices(self):
+        """Create the invoices of all orders, with their lines, in a single create"""
+        income_accounts = self._get_income_account_by_product()
+        # service amounts are stored computes on the invoice lines, no explicit call needed
+        return self.env['account.move'].create([
+            order._prepare_custom_invoice_vals(income_accounts) for order in self
+        ])
+
     def action_create_invoice(self):
         """Create invoice from sale order with all custom fields and lines"""
         self.ensure_one()
@@ -265,13 +371,9 @@ class SaleOrder(models.Model):
             raise UserError("You can only create invoices for confirmed sales orders.")
 
         # Check if invoice already exists
-        existing_invoice = self.env['account.move'].search([
-            ('sale_order_id', '=', self.id),
-            ('move_type', '=', 'out_invoice'),
-            ('state', '!=', 'cancel')
-        ], limit=1)
+        existing_invoice_id = self._get_existing_invoice_by_order().get(self.id)
 
-        if existing_invoice:
+        if existing_invoice_id:
             # Show notification
             return {
                 'type': 'ir.actions.client',
@@ -285,69 +387,14 @@ class SaleOrder(models.Model):
                         'type': 'ir.actions.act_window',
                         'name': _('Customer Invoice'),
                         'res_model': 'account.move',
-                        'res_id': existing_invoice.id,
+                        'res_id': existing_invoice_id,
                         'view_mode': 'form',
                         'target': 'current',
                     }
                 }
             }
 
-        # Prepare invoice values - Transfer ALL fields from Sale Order
-        invoice_vals = {
-            'move_type': 'out_invoice',
-            'partner_id': self.partner_id.id,
-            'invoice_date': fields.Date.today(),
-            'invoice_origin': self.name,
-            'sale_order_id': self.id,
-
-            # Transfer all custom fields
-            'subject': self.subject,
-            'location': self.location,
-            'gst_type': self.gst_type,
-            'discount_type': self.discount_type,
-            'discount_percent': self.discount_percent,
-            'discount_amt': self.discount_amt,
-            'gst_percent': self.gst_percent,
-            'currency_id': self.currency_id.id,
-            'company_id': self.company_id.id if self.company_id else self.env.company.id,
-        }
-
-        # Create the invoice
-        invoice = self.env['account.move'].create(invoice_vals)
-
-        # Create invoice lines from sale order lines
-        for line in self.order_line:
-            # Get the income account from product or fallback
-            account = line.product_id.property_account_income_id or \
-                      line.product_id.categ_id.property_account_income_categ_id
-
-            if not account:
-                raise UserError(_(
-                    'Please define income account for product: %s or its category.'
-                ) % line.product_id.name)
-
-            invoice_line_vals = {
-                'move_id': invoice.id,
-                'product_id': line.product_id.id,
-                'name': line.name,
-                'quantity': line.product_uom_qty,
-                'product_uom_id': line.product_uom_id.id,
-                'price_unit': line.price_unit,
-                'discount': line.discount,
-                'account_id': account.id,
-
-                # Transfer custom fields
-                'product_description': line.product_description,
-                'remarks': line.remarks,
-                'service_note': line.service_note,
-                'uom_id': line.uom_id.id if line.uom_id else False,
-                'cost_of_sales': line.cost_of_sales,
-            }
-
-            self.env['account.move.line'].create(invoice_line_vals)
-
-        # Compute amounts after lines are created
-        invoice._compute_service_amounts()
+        invoice = self._create_custom_invoices()
 
         # Show success notification and open invoice
         return {
@@ -369,6 +416,116 @@ class SaleOrder(models.Model):
             }
         }
 
+    def action_create_invoices(self):
+        """Batch version of ``action_create_invoice`` for the orders selected in the list"""
+        not_confirmed = self.filtered(lambda order: order.state != 'sale')
+        if not_confirmed:
+            raise UserError(_(
+                "You can only create invoices for confirmed sales orders: %s"
+            ) % ', '.join(not_confirmed.mapped('name')))
+
+        existing = self._get_existing_invoice_by_order()
+        orders = self.filtered(lambda order: order.id not in existing)
+        invoices = orders._create_custom_invoices() if orders else self.env['account.move']
+
+        if existing:
+            message = _('%(created)s invoice(s) created, %(skipped)s order(s) were already invoiced.',
+                        created=len(invoices), skipped=len(existing))
+        else:
+            message = _('%s invoice(s) created successfully.') % len(invoices)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Success!'),
+                'message': message,
+                'type': 'warning' if existing else 'success',
+                'sticky': False,
+                'next': {
+                    'type': 'ir.actions.act_window',
+                    'name': _('Customer Invoices'),
+                    'res_model': 'account.move',
+                    'domain': [('id', 'in', invoices.ids + list(existing.values()))],
+                    'view_mode': 'list,form',
+                    'target': 'current',
+                }
+            }
+        }
+
+    def _compute_boss_approval_threshold(self):
+        self.boss_approval_threshold = BOSS_APPROVAL_THRESHOLD
+
+    def _get_report_pages(self, lines_per_page=None):
+        """Order lines of the printed quotation split in pages: ``[(first_line_number, lines), ...]``"""
+        self.ensure_one()
+        lines_per_page = lines_per_page or QUOTATION_LINES_PER_PAGE
+        lines = self.order_line
+        return [
+            (page_start + 1, lines[page_start:page_start + lines_per_page])
+            for page_start in range(0, len(lines), lines_per_page)
+        ]
+
+    def _get_quotation_pdf_cache_key(self, report):
+        """
+        Version of everything printed on the quotation: the order, its lines and
+        products, the partners, states and company shown, the boss block, the
+        report and its templates. Any write on those (a module upgrade rewrites
+        the changed views) changes a write_date, hence the key, and discards
+        the cached PDF.
+        """
+        self.ensure_one()
+        partners = self.partner_id | self.client_id | self.contact_person_id | self.company_id.partner_id
+        bosses = self.env['res.partner']._get_boss_directory()['bosses']
+        records = (
+            self, self.order_line, self.order_line.product_id, self.order_line.uom_id,
+            partners, partners.state_id, self.company_id, self.user_id, bosses, bosses.partner_id,
+            report, self._get_quotation_report_views(report),
+        )
+        versions = [
+            str(max(record_set.sudo().mapped('write_date'), default=''))
+            for record_set in records
+        ]
+        versions += [str(len(self.order_line)), ','.join(map(str, bosses.ids)), self.env.lang or '']
+        return hashlib.sha1('|'.join(versions).encode()).hexdigest()
+
+    @api.model
+    def _get_quotation_report_views(self, report):
+        """The qweb views rendering the quotation, with every view inheriting from them"""
+        Views = self.env['ir.ui.view'].sudo()
+        views = Views.search([('key', 'in', (report.report_name, *QUOTATION_REPORT_TEMPLATES))])
+        children = views.inherit_children_ids
+        while children - views:
+            views |= children
+            children = views.inherit_children_ids
+        return views
+
+    def _get_quotation_pdf_cache(self):
+        self.ensure_one()
+        return self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_id', '=', self.id),
+            ('res_field', '=', 'quotation_pdf_cache'),
+        ], limit=1)
+
+    def _set_quotation_pdf_cache(self, pdf_content, cache_key):
+        """
+        Store the rendered PDF as the hidden attachment of ``quotation_pdf_cache``.
+        The attachment is replaced directly so the order's write_date, part of
+        the cache key, is left untouched.
+        """
+        self.ensure_one()
+        self._get_quotation_pdf_cache().unlink()
+        self.env['ir.attachment'].sudo().create({
+            'name': f'{self.name}.pdf',
+            'res_model': self._name,
+            'res_id': self.id,
+            'res_field': 'quotation_pdf_cache',
+            'type': 'binary',
+            'raw': pdf_content,
+            'mimetype': 'application/pdf',
+            'description': cache_key,
+        })
+
     def action_view_project(self):
         self.ensure_one()
         if self.project_id:
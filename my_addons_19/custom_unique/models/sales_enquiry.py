@@ -3,7 +3,6 @@
 from email.policy import default
 
 from odoo import api, fields, models, _
-from datetime import datetime
 from odoo.exceptions import ValidationError, UserError
 import uuid
 
@@ -11,7 +10,11 @@ class SaleEnquiry(models.Model):
     _name = "sale.enquiry"
     _description = "Sale Enquiry"
     _rec_name = 'sale_enquiry_ref'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'document.reference.mixin']
+
+    _reference_field = 'sale_enquiry_ref'
+    _reference_sequence_code = 'sale.enquiry'
+    _reference_doc_code = 'ENQ'
 
     # Enquiry Information
     sale_enquiry_ref = fields.Char(string="Enquiry Ref", readonly=True, copy=False, index=True, default='New')
@@ -23,7 +26,8 @@ class SaleEnquiry(models.Model):
         related="enquiry_id.create_date",
         store=True
     )
-    client_id = fields.Many2one('res.partner', string='Company Name', domain="[('parent_id', '=', False)]",related="enquiry_id.client_id")
+    client_id = fields.Many2one('res.partner', string='Company Name', domain="[('parent_id', '=', False)]",
+                                compute='_compute_dimensions', store=True, index=True)
     contact_person_id = fields.Many2one('res.partner', string='Contact Name', domain="[('parent_id', '=', client_id)]", related="enquiry_id.contact_person_id")
     work_location = fields.Selection([('office', 'Office'),('shipyard', 'Shipyard'),('onsite', 'On Site'),('client_site', 'Client Site'),('warehouse', 'Warehouse'),('other', 'Other'),
     ], string="Work Location", help="Select the location where the work will take place.")
@@ -42,24 +46,27 @@ class SaleEnquiry(models.Model):
         ('process_plant', 'Process Plant'),
         ('construction', 'Construction'),
         ('power_plant', 'Power Plant'),
-    ], string='Calcification', related='enquiry_id.calcification')
-    department_id = fields.Many2one("enquiry.department", string="Department", related='enquiry_id.department_id')
+    ], string='Calcification', compute='_compute_dimensions', store=True, index=True)
+    department_id = fields.Many2one("enquiry.department", string="Department", compute='_compute_dimensions',
+                                    store=True, index=True)
 
     # Sale Person information
     priority = fields.Selection([
         ('low', 'Low'),
         ('medium', 'Medium'),
         ('high', 'High'),
-    ], string='Priority', tracking=True, related='enquiry_id.priority')
+    ], string='Priority', tracking=True, compute='_compute_dimensions', store=True, index=True)
 
-    user_id = fields.Many2one('res.users',string='Sales Person',default=lambda self: self.env.user, related='enquiry_id.user_id')
-    enq_probability = fields.Float(string='Probability (%)', default=1, related='enquiry_id.enq_probability')
+    user_id = fields.Many2one('res.users', string='Sales Person', compute='_compute_dimensions', store=True,
+                              index=True)
+    enq_probability = fields.Float(string='Probability (%)', compute='_compute_dimensions', store=True)
     sector = fields.Selection([
         ('marine', 'Marine'),
         ('process', 'Process'),
         ('construction', 'Construction'),
         ('employment_agency', 'Employment Agency'),
-    ], string='Sector', related='client_id.sector', readonly=False)
+    ], string='Sector', compute='_compute_sector', inverse='_inverse_sector', store=True, index=True,
+        readonly=False)
     yeard_id = fields.Many2one('res.partner', string='Yard')
 
     #Project information
@@ -68,27 +75,51 @@ class SaleEnquiry(models.Model):
     project_id = fields.Many2one('project.project', string='Vessel Name', required=False)
     project_name = fields.Char(string="Project Name")
     vessel_name = fields.Char(string="Vessel Name")
-    sale_quotations_count = fields.Integer(compute='_compute_sale_quotations_count')
+    sale_order_ids = fields.One2many('sale.order', 'sale_enquiry_id', string='Quotations')
+    sale_quotations_count = fields.Integer(compute='_compute_sale_quotations_count', store=True)
     state = fields.Selection([('approved', 'Approved'),('reject', 'Rejected')], string='Status',tracking=True)
     is_approved = fields.Boolean(default=True)
     
+    @api.depends('enquiry_id')
+    def _compute_dimensions(self):
+        # stored copies of the enquiry dimensions, upstream changes come from dimension.propagation.queue
+        for rec in self:
+            enquiry = rec.enquiry_id
+            rec.client_id = enquiry.client_id
+            rec.department_id = enquiry.department_id
+            rec.user_id = enquiry.user_id
+            rec.priority = enquiry.priority
+            rec.calcification = enquiry.calcification
+            rec.enq_probability = enquiry.enq_probability
+
+    @api.depends('client_id')
+    def _compute_sector(self):
+        # client sector changes come from dimension.propagation.queue as well
+        for rec in self:
+            rec.sector = rec.client_id.sector
+
+    def _inverse_sector(self):
+        # the sector is the client's: editing it here updates the client, like the former related field
+        for rec in self.filtered('client_id'):
+            rec.client_id.sudo().sector = rec.sector
+
+    @api.depends('sale_order_ids')
     def _compute_sale_quotations_count(self):
+        # stored: counted for every user, not under the record rules of the one recomputing
+        counts = dict(self.env['sale.order'].sudo()._read_group(
+            [('sale_enquiry_id', 'in', self.ids)], ['sale_enquiry_id'], ['__count']))
         for rec in self:
-            sale_quotations = self.env['sale.order'].search_count([('id', '=', rec.sale_order_id.id)])
-            self.sale_quotations_count = sale_quotations
+            rec.sale_quotations_count = counts.get(rec._origin, 0)
+
+    def _get_reference_company_department(self, vals_list):
+        enquiries = self.env['enquiry.lead'].browse({vals['enquiry_id'] for vals in vals_list if vals.get('enquiry_id')})
+        enquiry_keys = {enquiry.id: (enquiry.company_id.id, enquiry.department_id.id) for enquiry in enquiries}
+        return [enquiry_keys.get(vals.get('enquiry_id'), (False, False)) for vals in vals_list]
 
     @api.model_create_multi
     def create(self, vals_list):
-        records = super().create(vals_list)
-        for record in records:
-            if not record.sale_enquiry_ref or record.sale_enquiry_ref == 'New':
-                company_code = record.company_id.code if record.company_id and record.company_id.code else 'CMP'
-                dept_code = record.department_id.code if record.department_id and record.department_id.code else 'DEPT'
-                current_year = datetime.now().year
-                seq_number = self.env['ir.sequence'].next_by_code('sale.enquiry')
-                seq_number = seq_number.split('-')[-1]
-                record.sale_enquiry_ref = f"{company_code}-ENQ-{dept_code}-{current_year}-{seq_number}"
-        return records
+        self._assign_references(vals_list)
+        return super().create(vals_list)
 
     def action_create_quotation(self):
         Project = self.env['project.project']
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from odoo import api, fields, models, tools
+
+
+class TrackingPolicy(models.Model):
+    """
+    Allowlist of the tracked fields of one model. Fields declared with
+    ``tracking=True`` but left out of the policy are not tracked anymore, so
+    recomputed amounts and hours stop writing tracking values and chatter
+    messages. Models without an active policy keep their declared tracking.
+    """
+    _name = 'tracking.policy'
+    _description = 'Field Tracking Policy'
+    _rec_name = 'model_id'
+
+    model_id = fields.Many2one('ir.model', string='Model', required=True, ondelete='cascade',
+                               domain="[('is_mail_thread', '=', True)]")
+    model = fields.Char(related='model_id.model', string='Model Name', store=True, index=True)
+    field_ids = fields.Many2many('ir.model.fields', string='Tracked Fields',
+                                 domain="[('model_id', '=', model_id), ('store', '=', True)]",
+                                 help="Only these fields are tracked in the chatter of the model.")
+    active = fields.Boolean(default=True)
+
+    _model_unique = models.Constraint('UNIQUE(model_id)', 'Only one tracking policy per model is allowed.')
+
+    @api.model
+    @tools.ormcache('model_name')
+    def _get_allowed_fields(self, model_name):
+        """Return the frozenset of tracked field names of ``model_name``, or None without policy"""
+        policy = self.sudo().search([('model', '=', model_name)], limit=1)
+        if not policy:
+            return None
+        return frozenset(policy.field_ids.mapped('name'))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        policies = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return policies
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+
+class MailThread(models.AbstractModel):
+    _inherit = 'mail.thread'
+
+    def _track_get_fields(self):
+        tracked_fields = super()._track_get_fields()
+        allowed_fields = self.env['tracking.policy']._get_allowed_fields(self._name)
+        if allowed_fields is None:
+            return tracked_fields
+        return set(tracked_fields) & allowed_fields
@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+from . import hr_attendance_report
+from . import sale_quotation_report
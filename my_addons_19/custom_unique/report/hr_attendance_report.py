@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from odoo import models, fields, tools
+
+
+class HrAttendanceReport(models.Model):
+    _name = 'hr.attendance.report'
+    _inherit = ['attendance.time.formatter']
+    _description = 'Attendance Analysis'
+    _auto = False
+    _rec_name = 'employee_name'
+    _order = 'attendance_date asc, id asc'
+
+    attendance_id = fields.Many2one('hr.attendance', string="Attendance", readonly=True)
+    attendance_date = fields.Date(string="Attendance Date", readonly=True)
+    attendance_day = fields.Char(string="Day", readonly=True)
+    check_in = fields.Datetime(string="Check In", readonly=True)
+    check_out = fields.Datetime(string="Check Out", readonly=True)
+
+    employee_id = fields.Many2one('hr.employee', string="Employee", readonly=True)
+    employee_name = fields.Char(string="Employee Name", readonly=True)
+    employee_code = fields.Char(string="Employee Code", readonly=True)
+    sector = fields.Selection([
+        ('marine', 'Marine'),
+        ('process', 'Process'),
+        ('construction', 'Construction'),
+        ('employment_agency', 'Employment Agency'),
+    ], string='Sector', readonly=True)
+    designation_id = fields.Many2one('hr.job', string="Designation", readonly=True)
+    # translated hr.job name, read in the user's language with the en_US fallback
+    designation_name = fields.Char(string="Designation Name", readonly=True, translate=True)
+    emp_working_dept = fields.Many2one('hr.department', string="Employee Working Department", readonly=True)
+    employee_department = fields.Char(string="Department", readonly=True)
+    work_location_id = fields.Many2one('hr.work.location', string="Location", readonly=True)
+    work_location_name = fields.Char(string="Location Name", readonly=True)
+    company_id = fields.Many2one('res.company', string="Company", readonly=True)
+    company_code = fields.Char(string="Company Code", readonly=True)
+
+    project_id = fields.Many2one('project.project', string="Project", readonly=True)
+    project_ref = fields.Char(string="Project No.", readonly=True)
+    vessel_name = fields.Char(string="Vessel Name", readonly=True)
+    client_id = fields.Many2one('res.partner', string="Client", readonly=True)
+    client_name = fields.Char(string="Client Name", readonly=True)
+    enquiry_department_code = fields.Char(string="Project Department", readonly=True)
+
+    currency_id = fields.Many2one('res.currency', string="Currency", readonly=True)
+    normal_hour = fields.Float(string="Normal Hour", readonly=True)
+    weekday_overtime_hours = fields.Float(string="WeekDay Overtime Hours", readonly=True)
+    weekend_overtime_hours = fields.Float(string="Weekend Overtime Hours", readonly=True)
+    worked_hours = fields.Float(string="Worked Hours", readonly=True)
+    rate_per_hour = fields.Monetary(string="Rate Per Hour", readonly=True, aggregator='avg')
+    total_hours_amount = fields.Monetary(string="Total (Hours × Rate)", readonly=True)
+    salary_rate_per_hour = fields.Monetary(string="Salary Rate Per Hour", readonly=True, aggregator='avg')
+    st_salary_total_hour = fields.Monetary(string="ST Total", readonly=True)
+    cpf_amount = fields.Monetary(string="CPF", readonly=True)
+    levy_amount = fields.Monetary(string="Levy", readonly=True)
+    accomodation_amount = fields.Monetary(string="Accommodation", readonly=True)
+    transportation_amount = fields.Monetary(string="Transportation", readonly=True)
+    insurance_amount = fields.Monetary(string="Insurance", readonly=True)
+    admin_cost_amount = fields.Monetary(string="Admin Cost", readonly=True)
+    certification_audit_cost_amount = fields.Monetary(string="Certification / Audit Cost", readonly=True)
+    office_rent_amount = fields.Monetary(string="Office Rent", readonly=True)
+    oh_cost_amount = fields.Monetary(string="OH Cost", readonly=True)
+    others_cost_amount = fields.Monetary(string="Others", readonly=True)
+    misc_amount = fields.Monetary(string="Misc", readonly=True)
+    total_expense = fields.Monetary(string="Total Expense", readonly=True)
+
+    def _select(self):
+        return """
+            SELECT
+                att.id AS id,
+                att.id AS attendance_id,
+                att.attendance_date AS attendance_date,
+                att.attendance_day AS attendance_day,
+                att.check_in AS check_in,
+                att.check_out AS check_out,
+                emp.id AS employee_id,
+                emp.name AS employee_name,
+                att.employee_code AS employee_code,
+                att.sector AS sector,
+                att.designation_id AS designation_id,
+                job.name AS designation_name,
+                att.emp_working_dept AS emp_working_dept,
+                att.employee_department AS employee_department,
+                loc.id AS work_location_id,
+                loc.name AS work_location_name,
+                att.company_id AS company_id,
+                att.company_code AS company_code,
+                att.project_id AS project_id,
+                att.project_ref AS project_ref,
+                att.vessel_name AS vessel_name,
+                att.client_id AS client_id,
+                client.name AS client_name,
+                att.enquiry_department_code AS enquiry_department_code,
+                att.currency_id AS currency_id,
+                att.normal_hour AS normal_hour,
+                att.weekday_overtime_hours AS weekday_overtime_hours,
+                att.weekend_overtime_hours AS weekend_overtime_hours,
+                att.worked_hours AS worked_hours,
+                att.rate_per_hour AS rate_per_hour,
+                att.total_hours_amount AS total_hours_amount,
+                att.salary_rate_per_hour AS salary_rate_per_hour,
+                att.st_salary_total_hour AS st_salary_total_hour,
+                COALESCE(alloc.cpf_amount, 0) AS cpf_amount,
+                COALESCE(alloc.levy_amount, 0) AS levy_amount,
+                COALESCE(alloc.accomodation_amount, 0) AS accomodation_amount,
+                COALESCE(alloc.transportation_amount, 0) AS transportation_amount,
+                COALESCE(alloc.insurance_amount, 0) AS insurance_amount,
+                COALESCE(alloc.admin_cost_amount, 0) AS admin_cost_amount,
+                COALESCE(alloc.certification_audit_cost_amount, 0) AS certification_audit_cost_amount,
+                COALESCE(alloc.office_rent_amount, 0) AS office_rent_amount,
+                COALESCE(alloc.oh_cost_amount, 0) AS oh_cost_amount,
+                COALESCE(alloc.others_cost_amount, 0) AS others_cost_amount,
+                att.misc_amount AS misc_amount,
+                COALESCE(alloc.total_amount, 0) + COALESCE(att.st_salary_total_hour, 0)
+                    + COALESCE(att.misc_amount, 0) AS total_expense
+        """
+
+    def _from(self):
+        # dimensions are read from their stored copies on hr_attendance, only names are joined;
+        # overheads come from the per-day allocation of the attendance date
+        return """
+            FROM hr_attendance att
+                JOIN hr_employee emp ON emp.id = att.employee_id
+                LEFT JOIN hr_job job ON job.id = att.designation_id
+                LEFT JOIN hr_work_location loc ON loc.id = emp.work_location_id
+                LEFT JOIN res_partner client ON client.id = att.client_id
+                LEFT JOIN hr_attendance_allocation alloc
+                       ON alloc.employee_id = att.employee_id
+                      AND alloc.month = date_trunc('month', att.attendance_date)::date
+                      AND att.attendance_date BETWEEN alloc.date_from AND alloc.date_to
+        """
+
+    def _where(self):
+        # closed months are read from their hr.attendance.summary snapshots
+        return """
+            WHERE NOT EXISTS (
+                SELECT 1
+                  FROM hr_attendance_period period
+                 WHERE period.state = 'closed'
+                   AND period.company_id = COALESCE(att.company_id, emp.company_id)
+                   AND period.date_from = date_trunc('month', att.attendance_date)::date
+            )
+        """
+
+    def _select_archive(self):
+        # archived attendances are per employee, project and day: even negative ids keep them
+        # apart from the attendances and the summaries, times and the attendance link are empty
+        return """
+            SELECT
+                -2 * arc.id AS id,
+                NULL::integer AS attendance_id,
+                arc.attendance_date AS attendance_date,
+                arc.attendance_day AS attendance_day,
+                NULL::timestamp AS check_in,
+                NULL::timestamp AS check_out,
+                emp.id AS employee_id,
+                emp.name AS employee_name,
+                arc.employee_code AS employee_code,
+                arc.sector AS sector,
+                arc.designation_id AS designation_id,
+                job.name AS designation_name,
+                arc.emp_working_dept AS emp_working_dept,
+                arc.employee_department AS employee_department,
+                loc.id AS work_location_id,
+                loc.name AS work_location_name,
+                arc.company_id AS company_id,
+                arc.company_code AS company_code,
+                arc.project_id AS project_id,
+                arc.project_ref AS project_ref,
+                arc.vessel_name AS vessel_name,
+                arc.client_id AS client_id,
+                client.name AS client_name,
+                arc.enquiry_department_code AS enquiry_department_code,
+                arc.currency_id AS currency_id,
+                arc.normal_hour AS normal_hour,
+                arc.weekday_overtime_hours AS weekday_overtime_hours,
+                arc.weekend_overtime_hours AS weekend_overtime_hours,
+                arc.worked_hours AS worked_hours,
+                arc.rate_per_hour AS rate_per_hour,
+                arc.total_hours_amount AS total_hours_amount,
+                arc.salary_rate_per_hour AS salary_rate_per_hour,
+                arc.st_salary_total_hour AS st_salary_total_hour,
+                arc.cpf_amount AS cpf_amount,
+                arc.levy_amount AS levy_amount,
+                arc.accomodation_amount AS accomodation_amount,
+                arc.transportation_amount AS transportation_amount,
+                arc.insurance_amount AS insurance_amount,
+                arc.admin_cost_amount AS admin_cost_amount,
+                arc.certification_audit_cost_amount AS certification_audit_cost_amount,
+                arc.office_rent_amount AS office_rent_amount,
+                arc.oh_cost_amount AS oh_cost_amount,
+                arc.others_cost_amount AS others_cost_amount,
+                arc.misc_amount AS misc_amount,
+                arc.total_expense AS total_expense
+        """
+
+    def _from_archive(self):
+        return """
+            FROM hr_attendance_archive arc
+                JOIN hr_employee emp ON emp.id = arc.employee_id
+                LEFT JOIN hr_job job ON job.id = arc.designation_id
+                LEFT JOIN hr_work_location loc ON loc.id = emp.work_location_id
+                LEFT JOIN res_partner client ON client.id = arc.client_id
+        """
+
+    def _where_archive(self):
+        # archived months that were reopened have no snapshot left
+        return """
+            WHERE NOT EXISTS (
+                SELECT 1
+                  FROM hr_attendance_period period
+                 WHERE period.state = 'closed'
+                   AND period.company_id = COALESCE(arc.company_id, emp.company_id)
+                   AND period.date_from = date_trunc('month', arc.attendance_date)::date
+            )
+        """
+
+    def _select_summary(self):
+        # one row per employee and project of a closed month, dated on the first day of the
+        # month: odd negative ids, dimensions from the current employee and project
+        return """
+            SELECT
+                -2 * summ.id - 1 AS id,
+                NULL::integer AS attendance_id,
+                period.date_from AS attendance_date,
+                NULL::varchar AS attendance_day,
+                NULL::timestamp AS check_in,
+                NULL::timestamp AS check_out,
+                emp.id AS employee_id,
+                emp.name AS employee_name,
+                emp.code AS employee_code,
+                emp.sector AS sector,
+                emp.job_id AS designation_id,
+                job.name AS designation_name,
+                emp.department_id AS emp_working_dept,
+                %(department_name)s AS employee_department,
+                loc.id AS work_location_id,
+                loc.name AS work_location_name,
+                period.company_id AS company_id,
+                company.code AS company_code,
+                summ.project_id AS project_id,
+                proj.project_ref AS project_ref,
+                %(project_name)s AS vessel_name,
+                proj.client_id AS client_id,
+                client.name AS client_name,
+                NULL::varchar AS enquiry_department_code,
+                company.currency_id AS currency_id,
+                NULL::float AS normal_hour,
+                summ.weekday_overtime_hours AS weekday_overtime_hours,
+                summ.weekend_overtime_hours AS weekend_overtime_hours,
+                summ.worked_hours AS worked_hours,
+                NULL::numeric AS rate_per_hour,
+                summ.total_hours_amount AS total_hours_amount,
+                NULL::numeric AS salary_rate_per_hour,
+                summ.st_salary_total_hour AS st_salary_total_hour,
+                summ.cpf_amount AS cpf_amount,
+                summ.levy_amount AS levy_amount,
+                summ.accomodation_amount AS accomodation_amount,
+                summ.transportation_amount AS transportation_amount,
+                summ.insurance_amount AS insurance_amount,
+                summ.admin_cost_amount AS admin_cost_amount,
+                summ.certification_audit_cost_amount AS certification_audit_cost_amount,
+                summ.office_rent_amount AS office_rent_amount,
+                summ.oh_cost_amount AS oh_cost_amount,
+                summ.others_cost_amount AS others_cost_amount,
+                summ.misc_amount AS misc_amount,
+                summ.total_expense AS total_expense
+        """ % {
+            'department_name': self._get_name_sql('hr.department', 'dept'),
+            'project_name': self._get_name_sql('project.project', 'proj'),
+        }
+
+    def _from_summary(self):
+        return """
+            FROM hr_attendance_summary summ
+                JOIN hr_attendance_period period ON period.id = summ.period_id AND period.state = 'closed'
+                JOIN hr_employee emp ON emp.id = summ.employee_id
+                JOIN res_company company ON company.id = period.company_id
+                LEFT JOIN hr_job job ON job.id = emp.job_id
+                LEFT JOIN hr_department dept ON dept.id = emp.department_id
+                LEFT JOIN hr_work_location loc ON loc.id = emp.work_location_id
+                LEFT JOIN project_project proj ON proj.id = summ.project_id
+                LEFT JOIN res_partner client ON client.id = proj.client_id
+        """
+
+    def _get_name_sql(self, model_name, alias):
+        """Text of the name column of ``alias``, the en_US value when the name is translated"""
+        if self.env[model_name]._fields['name'].translate:
+            return "%s.name->>'en_US'" % alias
+        return "%s.name" % alias
+
+    def _query(self):
+        return "%s %s %s UNION ALL %s %s %s UNION ALL %s %s" % (
+            self._select(), self._from(), self._where(),
+            self._select_archive(), self._from_archive(), self._where_archive(),
+            self._select_summary(), self._from_summary(),
+        )
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("CREATE OR REPLACE VIEW %s AS (%s)" % (self._table, self._query()))
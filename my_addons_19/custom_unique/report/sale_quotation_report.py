@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from odoo import api, models
+
+from ..models.sale_order import QUOTATION_LINES_PER_PAGE
+
+
+class SaleQuotationReport(models.AbstractModel):
+    _name = 'report.sale.report_saleorder'
+    _description = 'Sale Quotation Report'
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        """
+        Prepare everything the quotation template needs for all documents at
+        once, so printing many quotations does not look relations up per page.
+        """
+        docs = self.env['sale.order'].browse(docids)
+        # prefetch the relations read by the layout and the body in batch
+        docs.mapped('client_id.state_id')
+        docs.mapped('contact_person_id.name')
+        docs.mapped('company_id.partner_id.state_id')
+        docs.mapped('user_id.name')
+        docs.mapped('order_line.product_id.name')
+        docs.mapped('order_line.uom_id.name')
+
+        return {
+            'doc_ids': docs.ids,
+            'doc_model': 'sale.order',
+            'docs': docs,
+            'data': data,
+            'lines_per_page': QUOTATION_LINES_PER_PAGE,
+            'report_pages': {
+                doc.id: doc._get_report_pages(QUOTATION_LINES_PER_PAGE) for doc in docs
+            },
+            'boss_users': self.env['res.partner']._get_boss_directory()['bosses'],
+        }
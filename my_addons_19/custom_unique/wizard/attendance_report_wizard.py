@@ -2,11 +2,11 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 from datetime import datetime
-import pytz
 
 
 class HRAttendanceReportWizard(models.TransientModel):
     _name = 'hr.attendance.report.wizard'
+    _inherit = ['attendance.time.formatter']
     _description = 'HR Attendance Report Wizard'
 
     date_type = fields.Selection(
@@ -32,29 +32,6 @@ class HRAttendanceReportWizard(models.TransientModel):
             self.start_date = None
             self.end_date = None
 
-    def convert_utc_to_local_time_only(self, dt, tz_name='Asia/Kolkata'):
-        """
-        Convert UTC datetime → Any timezone → return only HH:MM string.
-
-        Default timezone: Asia/Kolkata
-        Example usage: 'Asia/Singapore'
-        """
-        if not dt:
-            return False
-
-        # If datetime is naive, make it UTC aware
-        if not dt.tzinfo:
-            dt = pytz.UTC.localize(dt)
-
-        # Convert to target timezone
-        try:
-            local_tz = pytz.timezone(tz_name)
-        except Exception:
-            local_tz = pytz.timezone('Asia/Kolkata')  # fallback
-
-        dt_local = dt.astimezone(local_tz)
-        return dt_local.strftime('%H:%M')
-
     def action_generate_report(self):
         """
         Generate the attendance report and send properly formatted values to the frontend.
@@ -79,13 +56,14 @@ class HRAttendanceReportWizard(models.TransientModel):
         if self.project_ids:
             domain.append(('project_id', 'in', self.project_ids.ids))
 
-        # Step 3: Fetch attendance records
-        attendances = self.env['hr.attendance'].search(domain)
+        # Step 3: Fetch flattened attendance rows (one query on the reporting view)
+        attendances = self.env['hr.attendance.report'].search(domain)
 
         if not attendances:
             raise UserError(_("No attendance records found for the selected filters."))
 
         # Step 4: Convert time fields to local timezone and prepare data
+        local_times = self._format_local_times(attendances)
         attendance_data = []
         for att in attendances:
             att_dict = {
@@ -94,22 +72,22 @@ class HRAttendanceReportWizard(models.TransientModel):
                 'attendance_day': att.attendance_day,
                 'project_ref': att.project_ref,
                 'enquiry_department_code': att.enquiry_department_code,
-                'client_id': att.client_id.id if att.client_id else False,
+                'client_id': [att.client_id.id, att.client_name] if att.client_id else False,
                 'vessel_name': att.vessel_name,
-                'employee_id': [att.employee_id.id, att.employee_id.name] if att.employee_id else False,
-                'designation_id': [att.designation_id.id, att.designation_id.name] if att.designation_id else False,
+                'employee_id': [att.employee_id.id, att.employee_name] if att.employee_id else False,
+                'designation_id': [att.designation_id.id, att.designation_name] if att.designation_id else False,
                 'company_code': att.company_code,
                 'sector': att.sector,
                 'employee_code': att.employee_code,
                 'employee_department': att.employee_department,
                 'work_location_id': [
                     att.work_location_id.id,
-                    att.work_location_id.name
+                    att.work_location_name
                 ] if att.work_location_id else False,
 
                 # ✅ Time fields in local timezone in HH:MM string format
-                'check_in': self.convert_utc_to_local_time_only(att.check_in),
-                'check_out': self.convert_utc_to_local_time_only(att.check_out),
+                'check_in': local_times[att.id]['check_in'],
+                'check_out': local_times[att.id]['check_out'],
 
                 # Numeric fields
                 'normal_hour': att.normal_hour,
@@ -7,6 +7,8 @@ from io import BytesIO
 import openpyxl
 import pytz
 
+from ..models.sale_order import BOSS_APPROVAL_THRESHOLD
+
 
 # class AttendanceImportWizard(models.TransientModel):
 #     _name = 'attendance.import.wizard'
@@ -209,28 +211,31 @@ class ApproveSaleOrderWizard(models.TransientModel):
     _name = 'approve.sale.quotation.wizard'
     _description = 'Approve Sale Quotation Wizard'
 
-    sale_order_id = fields.Many2one('sale.order', string="Sale Order")
+    sale_order_ids = fields.Many2many('sale.order', string="Sale Orders")
+    boss_approval_threshold = fields.Integer(string="Approval Threshold", default=BOSS_APPROVAL_THRESHOLD,
+                                             readonly=True)
 
     def action_approve_sale_order(self):
-        print("\n\n\n\n\n\n\n\n=====")
-        self.sale_order_id.boss_approval_required = True
-        boss_group = self.env.ref("custom_unique.group_unique_administrator")
-        boss_users = boss_group.user_ids
+        orders = self.sale_order_ids
+        orders.write({'boss_approval_required': True})
+        boss_users = self.env['res.partner']._get_boss_directory()['approvers']
         notify_msg = (
-            f"The quotation {self.sale_order_id.name} requires your approval because "
-            f"the amount is above $25,000."
+            f"The quotation(s) {', '.join(orders.mapped('name'))} require your approval because "
+            f"the amount is above ${BOSS_APPROVAL_THRESHOLD:,}."
         )
-        for boss_user in boss_users:
-            # Send notification
-            self.env['bus.bus']._sendone(
+        # one aggregated notification per boss for the whole selection
+        self.env['notification.dispatcher']._queue_many([
+            (
                 boss_user.partner_id,
                 'simple_notification',
                 {
                     'message': notify_msg,
                     'type': 'info',
                     'sticky': True,
-                }
+                },
             )
+            for boss_user in boss_users
+        ])
 
 class ProjectCancelReasonWizard(models.TransientModel):
     _name = 'project.cancel.reason'